@@ -1,5 +1,6 @@
 """Main CLI entry point for aftr."""
 
+import queue
 from pathlib import Path
 from typing import Optional
 
@@ -15,7 +16,11 @@ from aftr.commands.refs_cmd import refs_app
 from aftr.commands.init import init
 from aftr.commands.setup import setup
 from aftr.commands.ssh import ssh, ssh_menu
-from aftr.update import check_for_update, show_update_banner
+from aftr.update import (
+    show_update_banner,
+    start_background_update_check,
+    take_update_result,
+)
 
 console = Console()
 
@@ -407,6 +412,9 @@ def version_callback(value: bool) -> None:
         raise typer.Exit()
 
 
+# Seconds the interactive menu waits for the background update check
+MENU_UPDATE_WAIT = 1.0
+
 app = typer.Typer(
     name="aftr",
     help="CLI for bootstrapping Python data projects with UV, mise, and papermill",
@@ -428,12 +436,22 @@ def main(
     ),
 ) -> None:
     """AFTR - AI for The Rest. Bootstrap Python data projects."""
-    # Check for updates (silently fails on network errors)
-    update_info = check_for_update()
+    # Check for updates in the background (silently fails on network errors)
+    pending_update = start_background_update_check()
 
     if ctx.invoked_subcommand is None:
-        interactive_menu(update_info=update_info)
-    elif update_info:
+        # The banner is drawn before the menu, so give the check a moment
+        interactive_menu(
+            update_info=take_update_result(pending_update, wait=MENU_UPDATE_WAIT)
+        )
+    else:
+        ctx.call_on_close(lambda: _show_pending_update(pending_update))
+
+
+def _show_pending_update(pending_update: queue.Queue) -> None:
+    """Show the update banner once a command finishes, if the check is done."""
+    update_info = take_update_result(pending_update)
+    if update_info:
         show_update_banner(update_info)
 
 
@@ -1,5 +1,8 @@
 """Config command group - manage project templates."""
 
+import functools
+import os
+import tomllib
 from pathlib import Path
 from typing import Optional
 
@@ -333,6 +336,12 @@ def _load_ignore_patterns(project_path: Path) -> pathspec.PathSpec:
             if line and not line.startswith("#"):
                 patterns.append(line)
 
+    return _compile_ignore_spec(tuple(patterns))
+
+
+@functools.cache
+def _compile_ignore_spec(patterns: tuple[str, ...]) -> pathspec.PathSpec:
+    """Compile ignore patterns, reusing the PathSpec for a repeated pattern list."""
     return pathspec.PathSpec.from_lines("gitignore", patterns)
 
 
@@ -351,31 +360,38 @@ def _collect_project_files(
     files: list[tuple[Path, int]] = []
     warnings: list[str] = []
 
-    for file_path in project_path.rglob("*"):
-        if not file_path.is_file():
-            continue
-
-        # Get relative path for pattern matching
-        try:
-            rel_path = file_path.relative_to(project_path)
-        except ValueError:
-            continue
-
-        rel_path_str = str(rel_path).replace("\\", "/")
-
-        # Check if file should be ignored
-        if ignore_spec.match_file(rel_path_str):
-            continue
-
-        # Get file size
-        try:
-            size = file_path.stat().st_size
-        except OSError:
-            warnings.append(f"Could not read size of: {rel_path_str}")
-            continue
-
-        files.append((file_path, size))
-
+    # Ignored directories are pruned rather than walked and filtered file by
+    # file, so .venv/, .git/ and friends cost one match each. DirEntry answers
+    # is_dir/is_file/stat from the directory listing where it can.
+    def walk(directory: str, prefix: str) -> None:
+        with os.scandir(directory) as it:
+            entries = list(it)
+        subdirs: list[tuple[str, str]] = []
+        for entry in entries:
+            rel_path_str = prefix + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if not ignore_spec.match_file(rel_path_str + "/"):
+                    subdirs.append((entry.path, rel_path_str + "/"))
+                continue
+            if not entry.is_file() or ignore_spec.match_file(rel_path_str):
+                continue
+
+            # Get file size
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                warnings.append(f"Could not read size of: {rel_path_str}")
+                continue
+
+            files.append((Path(entry.path), size))
+
+        for subdir, sub_prefix in subdirs:
+            try:
+                walk(subdir, sub_prefix)
+            except OSError:
+                warnings.append(f"Could not read directory: {sub_prefix}")
+
+    walk(os.fspath(project_path), "")
     return files, warnings
 
 
@@ -510,8 +526,8 @@ def _extract_pyproject_info(project_path: Path) -> dict:
         return info
 
     try:
-        content = pyproject_path.read_text(encoding="utf-8")
-        doc = tomlkit.parse(content)
+        with open(pyproject_path, "rb") as f:
+            doc = tomllib.load(f)
 
         project = doc.get("project", {})
         info["requires_python"] = project.get("requires-python", ">=3.11")
@@ -574,8 +590,8 @@ def _extract_mise_info(project_path: Path) -> dict[str, str]:
         return {}
 
     try:
-        content = mise_path.read_text(encoding="utf-8")
-        doc = tomlkit.parse(content)
+        with open(mise_path, "rb") as f:
+            doc = tomllib.load(f)
 
         tools = doc.get("tools", {})
         return {str(k): str(v) for k, v in tools.items()}
@@ -595,8 +611,8 @@ def _detect_project_name(project_path: Path) -> str:
     pyproject_path = project_path / "pyproject.toml"
     if pyproject_path.exists():
         try:
-            content = pyproject_path.read_text(encoding="utf-8")
-            doc = tomlkit.parse(content)
+            with open(pyproject_path, "rb") as f:
+                doc = tomllib.load(f)
             project = doc.get("project", {})
             name = project.get("name", "")
             if name:
@@ -2,18 +2,22 @@
 
 from __future__ import annotations
 
+import functools
 from pathlib import Path
-from typing import Optional
+from typing import Annotated, Optional
 
 import typer
-from InquirerPy import inquirer
-from InquirerPy.utils import get_style
 from rich import print as rprint
 from rich.console import Console
 from rich.table import Table
 
 from aftr import refs as refs_module
 
+try:
+    from click import get_current_context
+except ImportError:  # newer Typer releases vendor Click instead of depending on it
+    from typer._click.globals import get_current_context
+
 console = Console()
 
 refs_app = typer.Typer(
@@ -22,20 +26,54 @@ refs_app = typer.Typer(
     no_args_is_help=True,
 )
 
-_PROMPT_STYLE = get_style(
-    {
-        "questionmark": "#E91E63 bold",
-        "pointer": "#00BCD4 bold",
-        "highlighted": "#00BCD4 bold",
-        "selected": "#4CAF50 bold",
-        "answer": "#00BCD4 bold",
-    }
-)
+# InquirerPy is imported lazily: only `refs add` without options prompts, and
+# loading it costs more than the rest of this module.
+
+
+@functools.cache
+def _prompt_style():
+    """Styling for InquirerPy."""
+    from InquirerPy.utils import get_style
+
+    return get_style(
+        {
+            "questionmark": "#E91E63 bold",
+            "pointer": "#00BCD4 bold",
+            "highlighted": "#00BCD4 bold",
+            "selected": "#4CAF50 bold",
+            "answer": "#00BCD4 bold",
+        }
+    )
+
+
+# Key for --project-root in the invocation's ctx.meta; the interactive menu
+# calls the commands without it and gets the current directory
+_PROJECT_ROOT_KEY = "aftr.refs.project_root"
+
+
+@refs_app.callback()
+def refs_options(
+    ctx: typer.Context,
+    project_root: Annotated[
+        Path | None,
+        typer.Option(
+            "--project-root",
+            help="Project directory holding .aftr/ (default: current directory)",
+            file_okay=False,
+        ),
+    ] = None,
+) -> None:
+    ctx.meta[_PROJECT_ROOT_KEY] = project_root
 
 
 def _find_project_dir() -> Path:
-    """Return cwd as the project root (where .aftr/ will be placed)."""
-    return Path.cwd()
+    """Return the project root (where .aftr/ will be placed).
+
+    This is --project-root when given, otherwise the current directory.
+    """
+    ctx = get_current_context(silent=True)
+    project_root = ctx.meta.get(_PROJECT_ROOT_KEY) if ctx is not None else None
+    return project_root if project_root is not None else Path.cwd()
 
 
 @refs_app.command("add")
@@ -45,7 +83,9 @@ def add_source(
         None, "--path", help="Path inside the repo to sync (e.g. docs/guides)"
     ),
     branch: Optional[str] = typer.Option(
-        None, "--branch", help="Branch to sync from (default: main)"
+        None,
+        "--branch",
+        help="Branch, or full commit SHA, to sync from (default: main)",
     ),
     name: Optional[str] = typer.Option(
         None, "--name", help="Short name for this source"
@@ -63,12 +103,15 @@ def add_source(
     project_dir = _find_project_dir()
 
     # Interactive mode when any required field is missing
+    if not (url and path and name and branch):
+        from InquirerPy import inquirer
+
     if not url:
         url = inquirer.text(
             message="Git repository URL:",
             validate=lambda x: len(x.strip()) > 0,
             invalid_message="URL cannot be empty",
-            style=_PROMPT_STYLE,
+            style=_prompt_style(),
         ).execute()
 
     if not path:
@@ -76,7 +119,7 @@ def add_source(
             message="Path inside repo to sync (e.g. docs/guides):",
             validate=lambda x: len(x.strip()) > 0,
             invalid_message="Path cannot be empty",
-            style=_PROMPT_STYLE,
+            style=_prompt_style(),
         ).execute()
 
     if not name:
@@ -87,14 +130,14 @@ def add_source(
             default=default_name,
             validate=lambda x: len(x.strip()) > 0,
             invalid_message="Name cannot be empty",
-            style=_PROMPT_STYLE,
+            style=_prompt_style(),
         ).execute()
 
     if not branch:
         branch = inquirer.text(
             message="Branch:",
             default="main",
-            style=_PROMPT_STYLE,
+            style=_prompt_style(),
         ).execute()
 
     # Normalise
@@ -106,7 +149,7 @@ def add_source(
 
     # Check for duplicate name
     sources = refs_module.load_refs_config(project_dir)
-    if any(s.name == name for s in sources):
+    if refs_module.find_refs_source(sources, name) is not None:
         rprint(f"[red]Error:[/red] A source named '{name}' already exists.")
         rprint(
             f"  Use [cyan]aftr refs remove {name}[/cyan] first, or choose a different name."
@@ -136,6 +179,11 @@ def sync_sources(
     force: bool = typer.Option(
         False, "--force", "-f", help="Re-sync even if already up to date"
     ),
+    cache_first: bool = typer.Option(
+        False,
+        "--cache-first",
+        help="Skip the remote check for sources that have been synced before",
+    ),
 ) -> None:
     """Sync reference files from registered sources.
 
@@ -152,18 +200,23 @@ def sync_sources(
         raise typer.Exit(0)
 
     if name:
-        targets = [s for s in sources if s.name == name]
-        if not targets:
+        target = refs_module.find_refs_source(sources, name)
+        if target is None:
             rprint(f"[red]Error:[/red] Source '{name}' not found.")
             raise typer.Exit(1)
+        targets = [target]
     else:
         targets = sources
 
-    any_error = False
-    for source in targets:
-        rprint(f"[cyan]Syncing[/cyan] {source.name} …")
-        result = refs_module.sync_source(project_dir, source, force=force)
+    with console.status(f"Syncing {len(targets)} source(s) …"):
+        results = refs_module.sync_all(
+            project_dir, targets, force=force, cache_first=cache_first
+        )
 
+    any_error = False
+    for result in results:
+        # The line below reports the outcome, which may be an error
+        rprint(f"[cyan]{result.name}[/cyan]")
         if result.status == "up_to_date":
             rprint(
                 f"  [dim]Already up to date[/dim] ({result.commit[:8] if result.commit else '?'})"
@@ -235,7 +288,7 @@ def remove_source(
     project_dir = _find_project_dir()
     sources = refs_module.load_refs_config(project_dir)
 
-    target = next((s for s in sources if s.name == name), None)
+    target = refs_module.find_refs_source(sources, name)
     if target is None:
         rprint(f"[red]Error:[/red] Source '{name}' not found.")
         raise typer.Exit(1)
@@ -1,7 +1,6 @@
 """Setup command - configure AI tools and SSH keys after environment setup."""
 
 import json
-import platform
 import subprocess
 from pathlib import Path
 
@@ -12,6 +11,7 @@ from rich import print
 from rich.panel import Panel
 
 from aftr.commands.ssh import (
+    current_system,
     discover_ssh_keys,
     generate_ssh_key,
     get_ssh_agent_status,
@@ -26,7 +26,7 @@ CLAUDE_SETTINGS_FILE = CLAUDE_SETTINGS_DIR / "settings.json"
 
 def _check_windows_ssh_agent() -> None:
     """Check if Windows SSH agent is running and provide instructions if not."""
-    if platform.system() != "Windows":
+    if current_system() != "Windows":
         return
 
     status = get_ssh_agent_status()
@@ -73,7 +73,7 @@ def _install_claude_code() -> bool:
 
     Returns True if installation succeeded, False otherwise.
     """
-    system = platform.system()
+    system = current_system()
 
     if system == "Windows":
         # Use PowerShell Core with the official installer
@@ -1,14 +1,25 @@
 """SSH key and agent management command."""
 
-import platform
+import base64
+import binascii
+import functools
+import hashlib
+import json
+import os
+import shutil
 import subprocess
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import typer
-from InquirerPy import inquirer
-from InquirerPy.utils import get_style
 from rich import print
-from rich.panel import Panel
+from rich.console import Console
+
+from aftr import config
+
+console = Console()
 
 # Default SSH key paths (used for generation)
 SSH_DIR = Path.home() / ".ssh"
@@ -16,19 +27,58 @@ SSH_KEY = SSH_DIR / "id_ed25519"
 SSH_PUB_KEY = SSH_DIR / "id_ed25519.pub"
 
 # Common SSH key names to look for (private key names, without .pub)
-COMMON_KEY_NAMES = [
-    "id_ed25519",
-    "id_rsa",
-    "id_ecdsa",
-    "id_ed25519_sk",
-    "id_ecdsa_sk",
-    "id_dsa",
-]
+COMMON_KEY_NAMES: frozenset[str] = frozenset(
+    {
+        "id_ed25519",
+        "id_rsa",
+        "id_ecdsa",
+        "id_ed25519_sk",
+        "id_ecdsa_sk",
+        "id_dsa",
+    }
+)
+
+# Upper bound (seconds) for non-interactive subprocesses so a wedged agent
+# socket or service manager can't hang the CLI
+SUBPROCESS_TIMEOUT = 5
+
+# A healthy agent lists identities almost instantly; a wedged socket (common
+# after suspend/resume) shouldn't stall `aftr ssh status` for long
+AGENT_LIST_TIMEOUT = 2
+
+# Windows native OpenSSH binaries (work with the Windows ssh-agent service)
+WINDOWS_SSH = "C:/Windows/System32/OpenSSH/ssh.exe"
+WINDOWS_SSH_ADD = "C:/Windows/System32/OpenSSH/ssh-add.exe"
+
+
+# Results of the last discover_ssh_keys() scan: "stamp", "keys" and, once
+# computed, "default" (see get_default_key)
+_key_cache: dict = {}
+
+
+def _ssh_dir_stamp() -> tuple | None:
+    """Identify the current state of ~/.ssh for cache validation."""
+    try:
+        dir_mtime = SSH_DIR.stat().st_mtime_ns
+    except OSError:
+        return None
+    try:
+        config_mtime = (SSH_DIR / "config").stat().st_mtime_ns
+    except OSError:
+        config_mtime = None
+    return (str(SSH_DIR), dir_mtime, config_mtime)
+
+
+def clear_key_cache() -> None:
+    """Forget cached key discovery results (e.g. after generating a key)."""
+    _key_cache.clear()
 
 
 def discover_ssh_keys() -> list[dict]:
     """Discover all SSH keys in ~/.ssh directory.
 
+    Results are reused for as long as ~/.ssh and its config are unchanged.
+
     Returns list of dicts with:
         - name: Key filename (without path)
         - private_path: Path to private key
@@ -36,46 +86,73 @@ def discover_ssh_keys() -> list[dict]:
         - has_public: Whether public key exists
         - key_type: Type of key (ed25519, rsa, etc.) if detectable
         - comment: Key comment from public key (usually email)
+        - fingerprint: SHA256 fingerprint, as printed by `ssh-keygen -l`
+        - bits: Key size in bits, if known
         - hosts: List of hosts this key is configured for in ssh config
     """
+    stamp = _ssh_dir_stamp()
+    if stamp is not None and _key_cache.get("stamp") == stamp:
+        return _key_cache["keys"]
+
+    keys = _scan_ssh_keys()
+    _key_cache.clear()
+    if stamp is not None:
+        _key_cache["stamp"] = stamp
+        _key_cache["keys"] = keys
+    return keys
+
+
+def _scan_ssh_keys() -> list[dict]:
+    """Scan ~/.ssh for key pairs (uncached, see discover_ssh_keys)."""
     keys = []
 
-    if not SSH_DIR.exists():
+    try:
+        with os.scandir(SSH_DIR) as it:
+            entries = list(it)
+    except OSError:
         return keys
 
+    # Compare plain names rather than building Path objects for every entry
+    names = {entry.name for entry in entries}
+
     # Find all potential private keys (files without .pub extension that have a .pub counterpart
     # or are in the common key names list)
-    for item in SSH_DIR.iterdir():
-        if not item.is_file():
+    for entry in entries:
+        try:
+            if not entry.is_file():
+                continue
+        except OSError:
             continue
 
+        name = entry.name
+
         # Skip public keys, known_hosts, config, etc.
-        if item.suffix in (".pub", ".old"):
+        if name.endswith((".pub", ".old")):
             continue
-        if item.name in ("known_hosts", "config", "authorized_keys", "environment"):
+        if name in ("known_hosts", "config", "authorized_keys", "environment"):
             continue
 
         # Check if this looks like a private key
-        pub_path = (
-            item.with_suffix(item.suffix + ".pub")
-            if item.suffix
-            else SSH_DIR / f"{item.name}.pub"
-        )
+        pub_name = name + ".pub"
+        has_public = pub_name in names
 
         # Either has a .pub counterpart or is a known key name
-        if pub_path.exists() or item.name in COMMON_KEY_NAMES:
+        if has_public or name in COMMON_KEY_NAMES:
+            pub_path = SSH_DIR / pub_name if has_public else None
             key_info = {
-                "name": item.name,
-                "private_path": item,
-                "public_path": pub_path if pub_path.exists() else None,
-                "has_public": pub_path.exists(),
+                "name": name,
+                "private_path": Path(entry.path),
+                "public_path": pub_path,
+                "has_public": has_public,
                 "key_type": None,
                 "comment": None,
+                "fingerprint": None,
+                "bits": None,
                 "hosts": [],
             }
 
             # Try to extract key type and comment from public key
-            if pub_path.exists():
+            if pub_path is not None:
                 try:
                     pub_content = pub_path.read_text().strip()
                     parts = pub_content.split(None, 2)
@@ -83,42 +160,133 @@ def discover_ssh_keys() -> list[dict]:
                         # Key type is the first part (ssh-ed25519, ssh-rsa, etc.)
                         key_type = parts[0].replace("ssh-", "")
                         key_info["key_type"] = key_type
+                    if len(parts) >= 2:
+                        raw = base64.b64decode(parts[1], validate=True)
+                        key_info["fingerprint"] = _fingerprint(raw)
+                        key_info["bits"] = _key_bits(raw)
                     if len(parts) >= 3:
                         key_info["comment"] = parts[2]
-                except (OSError, IndexError):
+                except (OSError, IndexError, binascii.Error):
                     pass
 
             keys.append(key_info)
 
     # Parse SSH config to find which hosts use which keys
-    config_path = SSH_DIR / "config"
-    if config_path.exists():
-        try:
-            config_content = config_path.read_text()
-            # Parse Host blocks and their IdentityFile settings
-            current_hosts = []
-            for line in config_content.splitlines():
-                line = line.strip()
-                if line.lower().startswith("host "):
-                    current_hosts = line[5:].split()
-                elif line.lower().startswith("identityfile "):
-                    identity_file = line[13:].strip()
-                    # Expand ~ to home directory
-                    identity_file = identity_file.replace("~", str(Path.home()))
-                    identity_path = Path(identity_file)
-                    # Match this identity file to our discovered keys
-                    for key in keys:
-                        if (
-                            key["private_path"] == identity_path
-                            or key["private_path"].name == identity_path.name
-                        ):
-                            key["hosts"].extend(current_hosts)
-        except OSError:
-            pass
+    hosts_by_identity = _load_cached_hosts_index(SSH_DIR / "config")
+    if hosts_by_identity:
+        # Keys all live in SSH_DIR, so the filename identifies them uniquely
+        keys_by_name = {key["name"]: key for key in keys}
+        for identity_name, hosts in hosts_by_identity.items():
+            key = keys_by_name.get(identity_name)
+            if key is not None:
+                key["hosts"].extend(hosts)
 
     return keys
 
 
+def _fingerprint(raw: bytes) -> str:
+    """Compute the OpenSSH SHA256 fingerprint of a decoded public key blob."""
+    digest = hashlib.sha256(raw).digest()
+    return "SHA256:" + base64.b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def _read_ssh_string(raw: bytes, offset: int) -> tuple[bytes, int]:
+    """Read one length-prefixed field of the SSH wire format."""
+    length = int.from_bytes(raw[offset : offset + 4], "big")
+    start = offset + 4
+    if start + length > len(raw):
+        raise ValueError("truncated SSH key blob")
+    return raw[start : start + length], start + length
+
+
+# Fixed key sizes by algorithm name
+KEY_BITS = {
+    b"ssh-ed25519": 256,
+    b"sk-ssh-ed25519@openssh.com": 256,
+    b"ecdsa-sha2-nistp256": 256,
+    b"sk-ecdsa-sha2-nistp256@openssh.com": 256,
+    b"ecdsa-sha2-nistp384": 384,
+    b"ecdsa-sha2-nistp521": 521,
+}
+
+
+def _key_bits(raw: bytes) -> int | None:
+    """Get the key size in bits from a decoded public key blob."""
+    try:
+        algorithm, offset = _read_ssh_string(raw, 0)
+        if algorithm in KEY_BITS:
+            return KEY_BITS[algorithm]
+        if algorithm == b"ssh-rsa":
+            # Public exponent, then modulus
+            _, offset = _read_ssh_string(raw, offset)
+            modulus, _ = _read_ssh_string(raw, offset)
+        elif algorithm == b"ssh-dss":
+            # Prime p determines the key size
+            modulus, _ = _read_ssh_string(raw, offset)
+        else:
+            return None
+    except ValueError:
+        return None
+    return int.from_bytes(modulus, "big").bit_length()
+
+
+def _parse_ssh_config_hosts(content: str) -> dict[str, list[str]]:
+    """Map IdentityFile names in an SSH config to the Host patterns using them."""
+    hosts_by_identity: dict[str, list[str]] = {}
+    # Parse Host blocks and their IdentityFile settings
+    current_hosts = []
+    for line in content.splitlines():
+        line = line.strip()
+        if line.lower().startswith("host "):
+            current_hosts = line[5:].split()
+        elif line.lower().startswith("identityfile "):
+            identity_file = line[13:].strip()
+            # Expand ~ to home directory (only a leading ~ is special)
+            identity_path = Path(identity_file.strip('"')).expanduser()
+            hosts_by_identity.setdefault(identity_path.name, []).extend(current_hosts)
+    return hosts_by_identity
+
+
+def _load_cached_hosts_index(config_path: Path) -> dict[str, list[str]]:
+    """Load the IdentityFile -> hosts index for an SSH config.
+
+    The parsed index is cached on disk and reused for as long as the config
+    file's path, mtime and size are unchanged.
+    """
+    try:
+        stat = config_path.stat()
+    except OSError:
+        return {}
+
+    stamp = [str(config_path), stat.st_mtime_ns, stat.st_size]
+    cache_path = config.get_cache_dir() / "ssh_config.json"
+
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if cached["stamp"] == stamp and isinstance(cached["hosts"], dict):
+            return cached["hosts"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    try:
+        hosts_by_identity = _parse_ssh_config_hosts(config_path.read_text())
+    except OSError:
+        return {}
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(
+            json.dumps(
+                {"stamp": stamp, "hosts": hosts_by_identity}, separators=(",", ":")
+            ),
+            encoding="utf-8",
+        )
+    except OSError:
+        pass
+
+    return hosts_by_identity
+
+
 def get_default_key() -> dict | None:
     """Get the default SSH key (id_ed25519 or first available).
 
@@ -128,6 +296,18 @@ def get_default_key() -> dict | None:
     if not keys:
         return None
 
+    # Reuse the choice made for this exact scan
+    if _key_cache.get("keys") is keys and "default" in _key_cache:
+        return _key_cache["default"]
+
+    default = _choose_default_key(keys)
+    if _key_cache.get("keys") is keys:
+        _key_cache["default"] = default
+    return default
+
+
+def _choose_default_key(keys: list[dict]) -> dict:
+    """Pick the default key from a non-empty list of discovered keys."""
     # Prefer id_ed25519
     for key in keys:
         if key["name"] == "id_ed25519":
@@ -139,41 +319,156 @@ def get_default_key() -> dict | None:
             return key
 
     # Fall back to any key
-    return keys[0] if keys else None
+    return keys[0]
 
 
-# Styling for InquirerPy
-PROMPT_STYLE = get_style(
-    {
-        "questionmark": "#E91E63 bold",
-        "pointer": "#00BCD4 bold",
-        "highlighted": "#00BCD4 bold",
-        "selected": "#4CAF50 bold",
-        "answer": "#00BCD4 bold",
-    }
-)
+# InquirerPy, rich.panel and platform are imported lazily so that loading this
+# module (which happens on every `aftr` launch) stays cheap.
 
 
-def _run_powershell(command: str, check: bool = False) -> subprocess.CompletedProcess:
+@functools.cache
+def _prompt_style():
+    """Styling for InquirerPy."""
+    from InquirerPy.utils import get_style
+
+    return get_style(
+        {
+            "questionmark": "#E91E63 bold",
+            "pointer": "#00BCD4 bold",
+            "highlighted": "#00BCD4 bold",
+            "selected": "#4CAF50 bold",
+            "answer": "#00BCD4 bold",
+        }
+    )
+
+
+@functools.cache
+def current_system() -> str:
+    """Return the platform name (e.g. "Windows", "Darwin", "Linux").
+
+    Computed once per process; it cannot change while aftr is running.
+    """
+    import platform
+
+    return platform.system()
+
+
+@functools.cache
+def _which(name: str) -> str:
+    """Resolve an executable on PATH once per process.
+
+    Falls back to the bare name, so a missing binary still raises
+    FileNotFoundError from subprocess.
+    """
+    return shutil.which(name) or name
+
+
+@functools.cache
+def _windows_openssh_exists(path: str) -> bool:
+    """Check whether a Windows OpenSSH binary is installed (once per process)."""
+    return Path(path).exists()
+
+
+def _run_powershell(
+    command: str, check: bool = False, timeout: float = SUBPROCESS_TIMEOUT
+) -> subprocess.CompletedProcess:
     """Run a PowerShell Core command."""
+    return _run([_which("pwsh"), "-Command", command], check=check, timeout=timeout)
+
+
+def _run(
+    cmd: list[str],
+    check: bool = False,
+    text: bool = True,
+    timeout: float | None = SUBPROCESS_TIMEOUT,
+) -> subprocess.CompletedProcess:
+    """Run a short-lived, non-interactive command and capture its output.
+
+    stdin is closed so the command can never block waiting for input.
+    close_fds=False is safe because Python creates its own descriptors
+    non-inheritable, and lets CPython use posix_spawn instead of fork+exec.
+    """
     return subprocess.run(
-        ["pwsh", "-Command", command],
+        cmd,
+        stdin=subprocess.DEVNULL,
         capture_output=True,
-        text=True,
+        close_fds=False,
+        text=text,
         check=check,
+        timeout=timeout,
     )
 
 
-def _run_bash(command: str, check: bool = False) -> subprocess.CompletedProcess:
-    """Run a bash command."""
-    return subprocess.run(
-        ["bash", "-c", command],
-        capture_output=True,
-        text=True,
-        check=check,
+# sc.exe exit code for ERROR_SERVICE_DOES_NOT_EXIST
+SC_SERVICE_MISSING = 1060
+
+# sc.exe state / start type names mapped to Get-Service's vocabulary
+SC_STATES = {"RUNNING": "Running", "STOPPED": "Stopped"}
+SC_START_TYPES = {
+    "AUTO_START": "Automatic",
+    "DEMAND_START": "Manual",
+    "DISABLED": "Disabled",
+}
+
+
+def _parse_sc_field(output: str, field: str) -> str | None:
+    """Get the symbolic value from an sc.exe `FIELD : <code>  <NAME>` line."""
+    for line in output.splitlines():
+        name, sep, value = line.partition(":")
+        if sep and name.strip() == field:
+            parts = value.split()
+            if len(parts) >= 2:
+                return parts[1]
+    return None
+
+
+def _query_service_sc(service: str) -> tuple[str, str] | None:
+    """Query a Windows service's status and startup type via sc.exe.
+
+    Returns (status, startup_type) in the same terms as Get-Service
+    ("Running"/"Stopped", "Automatic"/"Manual"/"Disabled"), with empty
+    strings if the service does not exist. Returns None if sc.exe could not
+    be used, so the caller can fall back to PowerShell.
+    """
+    try:
+        query = _run([_which("sc.exe"), "query", service])
+        if query.returncode == SC_SERVICE_MISSING:
+            return "", ""
+        state = _parse_sc_field(query.stdout, "STATE")
+        if query.returncode != 0 or state is None:
+            return None
+
+        qc = _run([_which("sc.exe"), "qc", service])
+        start_type = _parse_sc_field(qc.stdout, "START_TYPE") or ""
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+
+    return (
+        SC_STATES.get(state, state.title()),
+        SC_START_TYPES.get(start_type, start_type.title()),
     )
 
 
+def _agent_process_alive() -> bool:
+    """Check that the agent named by SSH_AGENT_PID is still running.
+
+    A socket left behind by a crashed agent still exists on disk, so the
+    SSH_AUTH_SOCK check alone can report a dead agent as running. Agents that
+    don't set SSH_AGENT_PID (launchd, forwarded agents) are assumed alive.
+    """
+    pid = os.environ.get("SSH_AGENT_PID")
+    if not pid:
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (ValueError, OverflowError, OSError):
+        # Unparseable PID, or the process exists but belongs to someone else
+        return True
+    return True
+
+
 def get_ssh_agent_status() -> dict:
     """Get SSH agent status across platforms.
 
@@ -183,7 +478,7 @@ def get_ssh_agent_status() -> dict:
         - message: Human-readable status
         - identities: List of loaded identities (if agent is running)
     """
-    system = platform.system()
+    system = current_system()
     result = {
         "status": "unknown",
         "auto_start": None,
@@ -193,17 +488,17 @@ def get_ssh_agent_status() -> dict:
 
     if system == "Windows":
         try:
-            # Check service status
-            status_result = _run_powershell(
-                "(Get-Service ssh-agent -ErrorAction SilentlyContinue).Status"
-            )
-            status = status_result.stdout.strip()
-
-            # Check startup type
-            startup_result = _run_powershell(
-                "(Get-Service ssh-agent -ErrorAction SilentlyContinue).StartType"
-            )
-            startup_type = startup_result.stdout.strip()
+            # sc.exe is a native binary and starts far faster than pwsh
+            service = _query_service_sc("ssh-agent")
+            if service is not None:
+                status, startup_type = service
+            else:
+                # Check service status and startup type in one pwsh launch
+                service_result = _run_powershell(
+                    "$s = Get-Service ssh-agent -ErrorAction SilentlyContinue; "
+                    '"$($s.Status)|$($s.StartType)"'
+                )
+                status, _, startup_type = service_result.stdout.strip().partition("|")
 
             if status == "Running":
                 result["status"] = "running"
@@ -223,22 +518,29 @@ def get_ssh_agent_status() -> dict:
                 result["status"] = "unknown"
                 result["message"] = f"SSH agent status: {status}"
 
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        except (
+            subprocess.CalledProcessError,
+            subprocess.TimeoutExpired,
+            FileNotFoundError,
+        ):
             result["status"] = "unknown"
             result["message"] = "Could not determine SSH agent status"
 
     else:  # macOS/Linux
         try:
             # Check if SSH_AUTH_SOCK is set (agent is available)
-            import os
-
             auth_sock = os.environ.get("SSH_AUTH_SOCK")
+            sock_exists = bool(auth_sock) and Path(auth_sock).exists()
 
-            if auth_sock and Path(auth_sock).exists():
+            if sock_exists and _agent_process_alive():
                 result["status"] = "running"
                 result["message"] = "SSH agent is running"
                 # macOS SSH agent auto-starts via LaunchAgent
                 result["auto_start"] = True if system == "Darwin" else None
+            elif sock_exists:
+                result["status"] = "stopped"
+                result["message"] = "SSH agent not running (stale SSH_AUTH_SOCK)"
+                result["auto_start"] = True if system == "Darwin" else None
             else:
                 result["status"] = "stopped"
                 result["message"] = "SSH agent not running (SSH_AUTH_SOCK not set)"
@@ -248,24 +550,54 @@ def get_ssh_agent_status() -> dict:
             result["status"] = "unknown"
             result["message"] = "Could not determine SSH agent status"
 
-    # Get loaded identities if agent is running
+    # Get loaded identities if agent is running (never when it is known to be
+    # stopped or missing)
     if result["status"] == "running":
         try:
-            list_result = subprocess.run(
-                ["ssh-add", "-l"],
-                capture_output=True,
-                text=True,
+            list_result = _run(
+                [_which("ssh-add"), "-l"], text=False, timeout=AGENT_LIST_TIMEOUT
             )
             if list_result.returncode == 0:
-                lines = list_result.stdout.strip().split("\n")
-                result["identities"] = [line for line in lines if line]
+                # Split the raw bytes and decode only the non-empty lines we keep
+                result["identities"] = [
+                    line.decode("utf-8", errors="replace")
+                    for line in list_result.stdout.splitlines()
+                    if line.strip()
+                ]
             # returncode 1 means "no identities" - that's okay
+        except subprocess.TimeoutExpired:
+            result["identities"] = []
+            result["message"] += " (but did not respond when listing identities)"
         except (subprocess.CalledProcessError, FileNotFoundError):
             pass
 
     return result
 
 
+def _read_git_global_config() -> dict[str, str]:
+    """Read the whole global git config with a single `git config` call.
+
+    Returns:
+        Mapping of lowercased keys (e.g. "core.sshcommand", "user.email") to
+        their last value. Empty if there is no global config.
+
+    Raises:
+        FileNotFoundError: If git is not installed.
+        subprocess.TimeoutExpired: If git does not answer in time.
+    """
+    list_result = _run([_which("git"), "config", "--global", "--list", "-z"])
+    if list_result.returncode != 0:
+        return {}
+
+    # -z output: "key\nvalue" entries separated by NUL (values may span lines)
+    git_config = {}
+    for entry in list_result.stdout.split("\0"):
+        if entry:
+            key, _, value = entry.partition("\n")
+            git_config[key.lower()] = value
+    return git_config
+
+
 def check_git_ssh_config() -> dict:
     """Check if git is configured to use SSH properly.
 
@@ -282,12 +614,10 @@ def check_git_ssh_config() -> dict:
         "issues": [],
     }
 
-    system = platform.system()
+    system = current_system()
 
     # Check GIT_SSH_COMMAND environment variable
     try:
-        import os
-
         ssh_command = os.environ.get("GIT_SSH_COMMAND")
         if ssh_command:
             result["ssh_command"] = ssh_command
@@ -296,24 +626,24 @@ def check_git_ssh_config() -> dict:
 
     # Check git config for core.sshCommand
     try:
-        git_ssh_result = subprocess.run(
-            ["git", "config", "--global", "core.sshCommand"],
-            capture_output=True,
-            text=True,
-        )
-        if git_ssh_result.returncode == 0 and git_ssh_result.stdout.strip():
-            result["ssh_command"] = git_ssh_result.stdout.strip()
+        git_config = _read_git_global_config()
+        ssh_command = git_config.get("core.sshcommand", "").strip()
+        if ssh_command:
+            result["ssh_command"] = ssh_command
     except (subprocess.CalledProcessError, FileNotFoundError):
         result["issues"].append("git command not found")
         result["configured"] = False
         return result
+    except subprocess.TimeoutExpired:
+        result["issues"].append("git config timed out")
+        result["configured"] = False
+        return result
 
     if system == "Windows":
         # Check if using Windows native OpenSSH
-        windows_ssh = "C:/Windows/System32/OpenSSH/ssh.exe"
         if (
             result["ssh_command"]
-            and windows_ssh.lower() in result["ssh_command"].lower()
+            and WINDOWS_SSH.lower() in result["ssh_command"].lower()
         ):
             result["uses_windows_openssh"] = True
         elif not result["ssh_command"]:
@@ -333,16 +663,16 @@ def configure_git_windows_openssh() -> bool:
 
     Returns True if configuration was successful.
     """
-    system = platform.system()
+    system = current_system()
 
     if system != "Windows":
         print("[dim]This configuration is only needed on Windows[/dim]")
         return False
 
-    windows_ssh = "C:/Windows/System32/OpenSSH/ssh.exe"
+    windows_ssh = WINDOWS_SSH
 
     # Check if Windows OpenSSH exists
-    if not Path(windows_ssh).exists():
+    if not _windows_openssh_exists(windows_ssh):
         print("[red]x[/red] Windows OpenSSH not found at expected location")
         print(
             "[dim]Install OpenSSH via: Settings > Apps > Optional Features > OpenSSH Client[/dim]"
@@ -352,10 +682,8 @@ def configure_git_windows_openssh() -> bool:
     print("[yellow]Configuring git to use Windows native OpenSSH...[/yellow]")
 
     try:
-        result = subprocess.run(
-            ["git", "config", "--global", "core.sshCommand", windows_ssh],
-            capture_output=True,
-            text=True,
+        result = _run(
+            [_which("git"), "config", "--global", "core.sshCommand", windows_ssh]
         )
 
         if result.returncode == 0:
@@ -375,6 +703,9 @@ def configure_git_windows_openssh() -> bool:
     except FileNotFoundError:
         print("[red]x[/red] git command not found")
         return False
+    except subprocess.TimeoutExpired:
+        print("[red]x[/red] git config timed out")
+        return False
 
 
 def view_public_key(key_path: Path | None = None) -> bool:
@@ -385,6 +716,8 @@ def view_public_key(key_path: Path | None = None) -> bool:
 
     Returns True if key was displayed, False if no key exists.
     """
+    from InquirerPy import inquirer
+
     # If no specific key provided, discover available keys
     if key_path is None:
         keys = discover_ssh_keys()
@@ -417,7 +750,7 @@ def view_public_key(key_path: Path | None = None) -> bool:
                 message="Which key would you like to view?",
                 choices=choices,
                 pointer=">",
-                style=PROMPT_STYLE,
+                style=_prompt_style(),
             ).execute()
 
             key_path = selected["public_path"]
@@ -425,11 +758,11 @@ def view_public_key(key_path: Path | None = None) -> bool:
     else:
         key_name = key_path.stem
 
-    if not key_path.exists():
+    try:
+        pub_key = key_path.read_text().strip()
+    except FileNotFoundError:
         print(f"[yellow]Public key not found: {key_path}[/yellow]")
         return False
-
-    pub_key = key_path.read_text().strip()
     print()
     print("[cyan]" + "=" * 60 + "[/cyan]")
     print(f"[yellow]SSH public key: {key_name}[/yellow]")
@@ -454,12 +787,14 @@ def generate_ssh_key(email: str | None = None) -> bool:
 
     Returns True if key was generated successfully.
     """
+    from InquirerPy import inquirer
+
     # Check if key already exists
     if SSH_KEY.exists():
         overwrite = inquirer.confirm(
             message="An SSH key already exists. Overwrite it?",
             default=False,
-            style=PROMPT_STYLE,
+            style=_prompt_style(),
         ).execute()
 
         if not overwrite:
@@ -472,7 +807,7 @@ def generate_ssh_key(email: str | None = None) -> bool:
             message="Enter your email for the SSH key:",
             validate=lambda x: len(x) > 0 and "@" in x,
             invalid_message="Please enter a valid email address",
-            style=PROMPT_STYLE,
+            style=_prompt_style(),
         ).execute()
 
         if not email:
@@ -487,7 +822,7 @@ def generate_ssh_key(email: str | None = None) -> bool:
     try:
         subprocess.run(
             [
-                "ssh-keygen",
+                _which("ssh-keygen"),
                 "-t",
                 "ed25519",
                 "-C",
@@ -501,9 +836,11 @@ def generate_ssh_key(email: str | None = None) -> bool:
             capture_output=True,
             text=True,
         )
+        clear_key_cache()
         print("[green]+[/green] SSH key generated!")
         print()
-        view_public_key()
+        # Show the key we just wrote rather than rescanning ~/.ssh
+        view_public_key(SSH_PUB_KEY)
         return True
 
     except subprocess.CalledProcessError as e:
@@ -519,7 +856,7 @@ def start_ssh_agent() -> bool:
 
     Returns True if agent is now running.
     """
-    system = platform.system()
+    system = current_system()
 
     if system == "Windows":
         print("[yellow]Starting SSH agent (requires Administrator)...[/yellow]")
@@ -527,7 +864,7 @@ def start_ssh_agent() -> bool:
 
         # Try to start the service
         try:
-            result = _run_powershell("Start-Service ssh-agent")
+            result = _run_powershell("Start-Service ssh-agent", timeout=30)
             if result.returncode == 0:
                 print("[green]+[/green] SSH agent started!")
                 return True
@@ -539,7 +876,11 @@ def start_ssh_agent() -> bool:
                 if result.stderr:
                     print(f"  [dim]Error: {result.stderr.strip()}[/dim]")
                 return False
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        except (
+            subprocess.CalledProcessError,
+            subprocess.TimeoutExpired,
+            FileNotFoundError,
+        ):
             print("[red]x[/red] Could not start SSH agent")
             return False
 
@@ -547,11 +888,7 @@ def start_ssh_agent() -> bool:
         print("[yellow]Starting SSH agent...[/yellow]")
         try:
             # Start ssh-agent and get the environment variables
-            result = subprocess.run(
-                ["ssh-agent", "-s"],
-                capture_output=True,
-                text=True,
-            )
+            result = _run([_which("ssh-agent"), "-s"])
             if result.returncode == 0:
                 print("[green]+[/green] SSH agent started!")
                 print()
@@ -564,6 +901,9 @@ def start_ssh_agent() -> bool:
         except FileNotFoundError:
             print("[red]x[/red] ssh-agent not found")
             return False
+        except subprocess.TimeoutExpired:
+            print("[red]x[/red] ssh-agent did not respond")
+            return False
 
 
 def enable_auto_start() -> bool:
@@ -571,7 +911,7 @@ def enable_auto_start() -> bool:
 
     Returns True if auto-start was configured.
     """
-    system = platform.system()
+    system = current_system()
 
     if system == "Windows":
         print(
@@ -580,7 +920,9 @@ def enable_auto_start() -> bool:
         print()
 
         try:
-            result = _run_powershell("Set-Service ssh-agent -StartupType Automatic")
+            result = _run_powershell(
+                "Set-Service ssh-agent -StartupType Automatic", timeout=30
+            )
             if result.returncode == 0:
                 print("[green]+[/green] SSH agent configured to start automatically!")
                 return True
@@ -592,7 +934,11 @@ def enable_auto_start() -> bool:
                 if result.stderr:
                     print(f"  [dim]Error: {result.stderr.strip()}[/dim]")
                 return False
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        except (
+            subprocess.CalledProcessError,
+            subprocess.TimeoutExpired,
+            FileNotFoundError,
+        ):
             print("[red]x[/red] Could not configure auto-start")
             return False
 
@@ -623,6 +969,8 @@ def add_key_to_agent(key_path: Path | None = None) -> bool:
 
     Returns True if key was added successfully.
     """
+    from InquirerPy import inquirer
+
     # If no specific key provided, discover available keys
     if key_path is None:
         keys = discover_ssh_keys()
@@ -654,7 +1002,7 @@ def add_key_to_agent(key_path: Path | None = None) -> bool:
                 message="Which key would you like to add to the agent?",
                 choices=choices,
                 pointer=">",
-                style=PROMPT_STYLE,
+                style=_prompt_style(),
             ).execute()
 
             key_path = selected["private_path"]
@@ -662,22 +1010,23 @@ def add_key_to_agent(key_path: Path | None = None) -> bool:
     else:
         key_name = key_path.name
 
-    if not key_path.exists():
-        print(f"[yellow]Private key not found: {key_path}[/yellow]")
-        return False
+        # Discovered keys were just listed from disk; only check explicit paths
+        if not os.path.exists(key_path):
+            print(f"[yellow]Private key not found: {key_path}[/yellow]")
+            return False
 
-    system = platform.system()
+    system = current_system()
 
     print(f"[yellow]Adding {key_name} to SSH agent...[/yellow]")
 
     # On Windows, use the Windows OpenSSH ssh-add to work with the Windows agent
     if system == "Windows":
-        ssh_add_cmd = "C:/Windows/System32/OpenSSH/ssh-add.exe"
+        ssh_add_cmd = WINDOWS_SSH_ADD
         # Fall back to PATH if Windows OpenSSH not found
-        if not Path(ssh_add_cmd).exists():
-            ssh_add_cmd = "ssh-add"
+        if not _windows_openssh_exists(ssh_add_cmd):
+            ssh_add_cmd = _which("ssh-add")
     else:
-        ssh_add_cmd = "ssh-add"
+        ssh_add_cmd = _which("ssh-add")
 
     try:
         if system == "Darwin":  # macOS
@@ -720,6 +1069,63 @@ def add_key_to_agent(key_path: Path | None = None) -> bool:
         return False
 
 
+# Lines from `ssh -T` after which GitHub has nothing more useful to say
+SSH_TEST_MARKERS = ("successfully authenticated", "permission denied")
+
+
+def _run_ssh_test(timeout: float) -> str:
+    """Run `ssh -T git@github.com` and return its combined output.
+
+    Output is read as it arrives and the connection is dropped as soon as
+    GitHub's success or permission-denied line shows up, instead of waiting
+    for the session to be torn down.
+
+    Raises:
+        subprocess.TimeoutExpired: If no verdict arrives within `timeout` seconds.
+    """
+    cmd = [
+        _which("ssh"),
+        "-T",
+        "git@github.com",
+        "-o",
+        "StrictHostKeyChecking=accept-new",
+        "-o",
+        "BatchMode=yes",
+    ]
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+
+    timed_out = threading.Event()
+
+    def _kill() -> None:
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, _kill)
+    timer.start()
+    lines = []
+    try:
+        for line in proc.stdout:
+            lines.append(line)
+            if any(marker in line.lower() for marker in SSH_TEST_MARKERS):
+                break
+    finally:
+        timer.cancel()
+        if proc.poll() is None:
+            proc.terminate()
+        proc.stdout.close()
+        proc.wait()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    return "".join(lines)
+
+
 def test_github_connection() -> bool:
     """Test SSH connection to GitHub.
 
@@ -729,16 +1135,9 @@ def test_github_connection() -> bool:
     print()
 
     try:
-        result = subprocess.run(
-            ["ssh", "-T", "git@github.com", "-o", "StrictHostKeyChecking=accept-new"],
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
-
         # GitHub returns exit code 1 even on success (it doesn't provide shell access)
         # Success message contains "successfully authenticated"
-        output = result.stdout + result.stderr
+        output = _run_ssh_test(timeout=30)
 
         if "successfully authenticated" in output.lower():
             print("[green]+[/green] SSH connection to GitHub successful!")
@@ -768,11 +1167,20 @@ def test_github_connection() -> bool:
 
 def show_status() -> None:
     """Show comprehensive SSH status."""
+    from rich.panel import Panel
+
     print(Panel("[cyan]SSH Status[/cyan]"))
     print()
 
-    # Discover all SSH keys
-    keys = discover_ssh_keys()
+    # Key discovery (disk) and the agent/git checks (subprocesses) are
+    # independent; gather them side by side, then render sequentially
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        keys_future = pool.submit(discover_ssh_keys)
+        status_future = pool.submit(get_ssh_agent_status)
+        git_config_future = pool.submit(check_git_ssh_config)
+    keys = keys_future.result()
+    status = status_future.result()
+    git_config = git_config_future.result()
 
     # SSH Key status
     print("[yellow]SSH Keys:[/yellow]")
@@ -793,17 +1201,9 @@ def show_status() -> None:
                 print(f"      [dim]Hosts: {', '.join(key['hosts'])}[/dim]")
 
             # Show fingerprint if public key exists
-            if key["has_public"]:
-                try:
-                    result = subprocess.run(
-                        ["ssh-keygen", "-l", "-f", str(key["public_path"])],
-                        capture_output=True,
-                        text=True,
-                    )
-                    if result.returncode == 0:
-                        print(f"      [dim]Fingerprint: {result.stdout.strip()}[/dim]")
-                except (subprocess.CalledProcessError, FileNotFoundError):
-                    pass
+            if key["fingerprint"]:
+                bits = f"{key['bits']} " if key["bits"] else ""
+                print(f"      [dim]Fingerprint: {bits}{key['fingerprint']}[/dim]")
 
             if not key["has_public"]:
                 print("      [dim]No public key found (.pub file missing)[/dim]")
@@ -814,7 +1214,6 @@ def show_status() -> None:
 
     # SSH Agent status
     print("[yellow]SSH Agent:[/yellow]")
-    status = get_ssh_agent_status()
 
     if status["status"] == "running":
         print(f"  [green]+[/green] {status['message']}")
@@ -843,7 +1242,6 @@ def show_status() -> None:
 
     # Git SSH config
     print("[yellow]Git SSH Config:[/yellow]")
-    git_config = check_git_ssh_config()
 
     if git_config["issues"]:
         for issue in git_config["issues"]:
@@ -858,17 +1256,41 @@ def show_status() -> None:
         if git_config["uses_windows_openssh"]:
             print("  [green]+[/green] Using Windows native OpenSSH")
         print(f"  [dim]core.sshCommand: {git_config['ssh_command']}[/dim]")
-    elif platform.system() == "Windows":
+    elif current_system() == "Windows":
         print("  [dim]Using default SSH (may not work with Windows agent)[/dim]")
     else:
         print("  [dim]Using default SSH[/dim]")
 
 
+# Actions available as `aftr ssh <action>` and from the interactive menu
+SSH_ACTIONS: dict[str, Callable[[], object]] = {
+    "status": show_status,
+    "view": view_public_key,
+    "generate": generate_ssh_key,
+    "add": add_key_to_agent,
+    "start": start_ssh_agent,
+    "autostart": enable_auto_start,
+    "test": test_github_connection,
+    "gitconfig": configure_git_windows_openssh,
+}
+
+# Menu labels, in display order
+SSH_MENU_LABELS = {
+    "status": "View Status",
+    "view": "View Public Key",
+    "generate": "Generate SSH Key",
+    "add": "Add Key to Agent",
+    "start": "Start SSH Agent",
+    "autostart": "Enable Auto-Start",
+    "test": "Test GitHub Connection",
+    "gitconfig": "Configure Git for Windows OpenSSH",
+}
+
+
 def ssh_menu() -> None:
     """Show the SSH management submenu."""
-    from rich.console import Console
-
-    console = Console()
+    from InquirerPy import inquirer
+    from rich.panel import Panel
 
     while True:
         console.print()
@@ -876,21 +1298,11 @@ def ssh_menu() -> None:
         console.print()
 
         choices = [
-            {"name": "View Status", "value": "status"},
-            {"name": "View Public Key", "value": "view"},
-            {"name": "Generate SSH Key", "value": "generate"},
-            {"name": "Add Key to Agent", "value": "add"},
-            {"name": "Start SSH Agent", "value": "start"},
-            {"name": "Enable Auto-Start", "value": "autostart"},
-            {"name": "Test GitHub Connection", "value": "test"},
+            {"name": label, "value": action}
+            for action, label in SSH_MENU_LABELS.items()
+            # Windows-specific option
+            if action != "gitconfig" or current_system() == "Windows"
         ]
-
-        # Add Windows-specific option
-        if platform.system() == "Windows":
-            choices.append(
-                {"name": "Configure Git for Windows OpenSSH", "value": "gitconfig"}
-            )
-
         choices.append({"name": "Back", "value": "back"})
 
         action = inquirer.select(
@@ -898,43 +1310,20 @@ def ssh_menu() -> None:
             choices=choices,
             default="status",
             pointer=">",
-            style=PROMPT_STYLE,
+            style=_prompt_style(),
         ).execute()
 
         console.print()
 
-        if action == "status":
-            show_status()
-
-        elif action == "view":
-            view_public_key()
-
-        elif action == "generate":
-            generate_ssh_key()
-
-        elif action == "add":
-            add_key_to_agent()
-
-        elif action == "start":
-            start_ssh_agent()
-
-        elif action == "autostart":
-            enable_auto_start()
-
-        elif action == "test":
-            test_github_connection()
-
-        elif action == "gitconfig":
-            configure_git_windows_openssh()
-
-        elif action == "back":
+        if action == "back":
             return
+        SSH_ACTIONS[action]()
 
 
 def ssh(
     action: str = typer.Argument(
         None,
-        help="Action: status, view, generate, add, start, autostart, test, gitconfig",
+        help=f"Action: {', '.join(SSH_ACTIONS)}",
     ),
 ) -> None:
     """Manage SSH keys and agent for Git authentication.
@@ -957,25 +1346,9 @@ def ssh(
 
     action = action.lower()
 
-    if action == "status":
-        show_status()
-    elif action == "view":
-        view_public_key()
-    elif action == "generate":
-        generate_ssh_key()
-    elif action == "add":
-        add_key_to_agent()
-    elif action == "start":
-        start_ssh_agent()
-    elif action == "autostart":
-        enable_auto_start()
-    elif action == "test":
-        test_github_connection()
-    elif action == "gitconfig":
-        configure_git_windows_openssh()
-    else:
+    handler = SSH_ACTIONS.get(action)
+    if handler is None:
         print(f"[red]Unknown action: {action}[/red]")
-        print(
-            "[dim]Valid actions: status, view, generate, add, start, autostart, test, gitconfig[/dim]"
-        )
+        print(f"[dim]Valid actions: {', '.join(SSH_ACTIONS)}[/dim]")
         raise typer.Exit(1)
+    handler()
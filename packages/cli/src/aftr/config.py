@@ -1,11 +1,18 @@
 """Configuration directory management and template registry."""
 
+import copy
+import tomllib
 from pathlib import Path
 from typing import Optional
 
 import platformdirs
 import tomlkit
 
+# Last registry read from or written to disk, with the (path, mtime, size)
+# stamp of the file it corresponds to
+_registry_cache: dict | None = None
+_registry_stamp: tuple | None = None
+
 
 def get_config_dir() -> Path:
     """Get the aftr configuration directory path.
@@ -17,6 +24,17 @@ def get_config_dir() -> Path:
     return Path(platformdirs.user_config_dir("aftr", appauthor=False))
 
 
+def get_cache_dir() -> Path:
+    """Get the aftr cache directory path.
+
+    Returns:
+        ~/.cache/aftr/ on Linux
+        ~/Library/Caches/aftr/ on macOS
+        ~/AppData/Local/aftr/Cache/ on Windows
+    """
+    return Path(platformdirs.user_cache_dir("aftr", appauthor=False))
+
+
 def get_templates_dir() -> Path:
     """Get the templates directory path."""
     return get_config_dir() / "templates"
@@ -33,18 +51,38 @@ def ensure_config_dirs() -> None:
     get_templates_dir().mkdir(parents=True, exist_ok=True)
 
 
+def _registry_file_stamp(registry_path: Path) -> tuple | None:
+    """Identify the on-disk version of registry.toml, or None if missing."""
+    try:
+        stat = registry_path.stat()
+    except OSError:
+        return None
+    return (str(registry_path), stat.st_mtime_ns, stat.st_size)
+
+
 def load_registry() -> dict:
     """Load the template registry.
 
+    The parsed registry is cached and reused until registry.toml changes on
+    disk. Callers get their own copy, so edits only reach the cache once
+    save_registry() has written them.
+
     Returns:
         Registry dictionary with 'templates' key containing template metadata.
     """
+    global _registry_cache, _registry_stamp
+
     registry_path = get_registry_path()
-    if not registry_path.exists():
+    stamp = _registry_file_stamp(registry_path)
+    if stamp is None:
         return {"templates": {}}
-
-    content = registry_path.read_text(encoding="utf-8")
-    return tomlkit.parse(content)
+    if _registry_cache is None or stamp != _registry_stamp:
+        # Read-only path: the C-accelerated stdlib parser is much faster than
+        # tomlkit, and save_registry() builds a fresh document anyway
+        with registry_path.open("rb") as f:
+            _registry_cache = tomllib.load(f)
+        _registry_stamp = stamp
+    return copy.deepcopy(_registry_cache)
 
 
 def save_registry(registry: dict) -> None:
@@ -53,6 +91,8 @@ def save_registry(registry: dict) -> None:
     Args:
         registry: Registry dictionary to save.
     """
+    global _registry_cache, _registry_stamp
+
     ensure_config_dirs()
     registry_path = get_registry_path()
 
@@ -65,6 +105,9 @@ def save_registry(registry: dict) -> None:
 
     registry_path.write_text(tomlkit.dumps(doc), encoding="utf-8")
 
+    _registry_cache = copy.deepcopy(registry)
+    _registry_stamp = _registry_file_stamp(registry_path)
+
 
 def register_template(name: str, source_url: Optional[str] = None) -> None:
     """Register a template in the registry.
@@ -2,36 +2,73 @@
 
 from __future__ import annotations
 
+import functools
+import hashlib
 import json
+import os
+import posixpath
+import re
 import shutil
 import subprocess
-import tempfile
+import tarfile
+import threading
+import tomllib
+import uuid
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
 import tomlkit
 
+from aftr import config
+
+try:
+    # Optional: orjson reads and writes the state file several times faster,
+    # and its indented output is byte-identical to the stdlib fallback's
+    from orjson import OPT_INDENT_2
+    from orjson import dumps as _orjson_dumps
+    from orjson import loads as _json_loads
+
+    def _json_dumps(obj: dict) -> bytes:
+        return _orjson_dumps(obj, option=OPT_INDENT_2)
+
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj: dict) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
 AFTR_DIR = ".aftr"
 REFS_CONFIG = "refs.toml"
 REFS_STATE = ".state.json"
 GITIGNORE_ENTRY = ".aftr/.state.json"
+REFS_TTL_ENV = "AFTR_REFS_TTL"
+DEFAULT_REFS_TTL = 300.0
+REFS_CACHE_MAX_BYTES_ENV = "AFTR_REFS_CACHE_MAX_BYTES"
+DEFAULT_REFS_CACHE_MAX_BYTES = 2 * 1024**3
 
+# A full commit SHA in place of a branch name pins the source to that commit
+_PINNED_COMMIT = re.compile(r"[0-9a-f]{40}")
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class RefsSource:
+    # Frozen so load_refs_config can hand out its cached instances safely
     name: str
     url: str
     path: str
-    branch: str = "main"
+    branch: str = "main"  # or a full commit SHA, see _pinned_commit()
     local_dir: str = field(default="")
 
     def __post_init__(self) -> None:
         if not self.local_dir:
-            self.local_dir = self.name
+            object.__setattr__(self, "local_dir", self.name)
 
 
-@dataclass
+@dataclass(slots=True)
 class SyncResult:
     name: str
     status: str  # "up_to_date" | "updated" | "error"
@@ -48,11 +85,30 @@ def _aftr_dir(project_dir: Path) -> Path:
     return project_dir / AFTR_DIR
 
 
+# Parsed refs.toml per path, with the (mtime_ns, size) it was parsed at
+_refs_config_cache: dict[Path, tuple[tuple[int, int], list[RefsSource]]] = {}
+
+
 def load_refs_config(project_dir: Path) -> list[RefsSource]:
+    """Load the registered sources from .aftr/refs.toml.
+
+    The parse is cached and reused until the file changes on disk, so the
+    interactive menu and the command it dispatches to share one read. Each
+    call returns a new list the caller may modify; the sources themselves are
+    frozen.
+    """
     config_path = _aftr_dir(project_dir) / REFS_CONFIG
-    if not config_path.exists():
+    try:
+        stat = config_path.stat()
+    except FileNotFoundError:
         return []
-    doc = tomlkit.parse(config_path.read_text(encoding="utf-8"))
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _refs_config_cache.get(config_path)
+    if cached is not None and cached[0] == stamp:
+        return list(cached[1])
+
+    with open(config_path, "rb") as f:
+        doc = tomllib.load(f)
     sources = []
     for item in doc.get("sources", []):
         sources.append(
@@ -64,7 +120,13 @@ def load_refs_config(project_dir: Path) -> list[RefsSource]:
                 local_dir=str(item.get("local_dir", item["name"])),
             )
         )
-    return sources
+    _refs_config_cache[config_path] = (stamp, sources)
+    return list(sources)
+
+
+def find_refs_source(sources: Iterable[RefsSource], name: str) -> RefsSource | None:
+    """Return the source called name, stopping at the first match."""
+    return next((s for s in sources if s.name == name), None)
 
 
 def save_refs_config(project_dir: Path, sources: list[RefsSource]) -> None:
@@ -85,6 +147,7 @@ def save_refs_config(project_dir: Path, sources: list[RefsSource]) -> None:
         aot.append(t)
     doc.add("sources", aot)
     config_path.write_text(tomlkit.dumps(doc), encoding="utf-8")
+    _refs_config_cache.pop(config_path, None)
 
 
 # ---------------------------------------------------------------------------
@@ -94,19 +157,23 @@ def save_refs_config(project_dir: Path, sources: list[RefsSource]) -> None:
 
 def load_refs_state(project_dir: Path) -> dict:
     state_path = _aftr_dir(project_dir) / REFS_STATE
-    if not state_path.exists():
-        return {"sources": {}}
     try:
-        return json.loads(state_path.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError):
+        return _json_loads(state_path.read_bytes())
+    except (ValueError, OSError):
+        # ValueError covers both parsers' decode errors; OSError a missing file
         return {"sources": {}}
 
 
 def save_refs_state(project_dir: Path, state: dict) -> None:
     aftr_dir = _aftr_dir(project_dir)
     aftr_dir.mkdir(exist_ok=True)
+    _write_refs_state(aftr_dir, state)
+
+
+def _write_refs_state(aftr_dir: Path, state: dict) -> None:
+    """Write the state file into an ``aftr_dir`` that already exists."""
     state_path = aftr_dir / REFS_STATE
-    state_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    state_path.write_bytes(_json_dumps(state))
 
 
 # ---------------------------------------------------------------------------
@@ -114,27 +181,121 @@ def save_refs_state(project_dir: Path, state: dict) -> None:
 # ---------------------------------------------------------------------------
 
 
+@functools.cache
+def _git_path() -> str | None:
+    """Return the absolute path of the git executable, or None if missing.
+
+    PATH doesn't change during a CLI run, so it is scanned once per process.
+    Spawning the resolved path also spares each subprocess its own PATH walk.
+    """
+    return shutil.which("git")
+
+
 def _git_available() -> bool:
-    return shutil.which("git") is not None
+    return _git_path() is not None
+
+
+@functools.cache
+def _pygit2():
+    """Return the optional pygit2 module, or None when it isn't installed."""
+    try:
+        import pygit2
+    except ImportError:
+        return None
+    return pygit2
+
+
+def _ls_remote_pygit2(url: str, branches: Iterable[str]) -> dict[str, str] | None:
+    """List remote heads in-process with libgit2 when pygit2 is installed.
+
+    Returns None whenever the git CLI should be used instead: pygit2 is
+    missing, or libgit2 can't reach or authenticate to the remote (for
+    example an ssh URL without a usable ssh-agent).
+    """
+    pygit2 = _pygit2()
+    if pygit2 is None:
+        return None
+
+    class Callbacks(pygit2.RemoteCallbacks):
+        attempted = False
+
+        def credentials(self, url, username_from_url, allowed_types):
+            # libgit2 keeps asking after a failed attempt; give up after one
+            if (
+                self.attempted
+                or not allowed_types & pygit2.enums.CredentialType.SSH_KEY
+            ):
+                raise pygit2.GitError("no usable credentials")
+            self.attempted = True
+            return pygit2.KeypairFromAgent(username_from_url or "git")
+
+    wanted = set(branches)
+    try:
+        cache = _cache_repo_path(url)
+        if (cache / "HEAD").exists():
+            repo = pygit2.Repository(str(cache))
+        else:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            repo = pygit2.init_repository(str(cache), bare=True)
+        remote = repo.remotes.create_anonymous(url)
+        remote_heads = remote.list_heads(callbacks=Callbacks())
+    except (pygit2.GitError, AttributeError, OSError, ValueError):
+        return None
+
+    heads = {}
+    for head in remote_heads:
+        if not (head.name or "").startswith("refs/heads/"):
+            continue
+        branch = head.name.removeprefix("refs/heads/")
+        if not wanted or branch in wanted:
+            heads[branch] = str(head.oid)
+    return heads
 
 
 def get_remote_commit(url: str, branch: str) -> str | None:
     """Return the current HEAD SHA for a remote branch, or None on failure."""
+    return get_remote_commits(url, [branch]).get(branch)
+
+
+def get_remote_commits(url: str, branches: Iterable[str] = ()) -> dict[str, str]:
+    """Return a {branch: sha} map of a remote's heads, or {} on failure.
+
+    Uses a single `git ls-remote` round-trip over protocol v2, so the
+    server filters refs by prefix instead of advertising all of them. Pass
+    branches to limit the listing to those heads; by default every head is
+    returned.
+    """
+    heads = _ls_remote_pygit2(url, branches)
+    if heads is not None:
+        return heads
     if not _git_available():
-        return None
+        return {}
     try:
         result = subprocess.run(
-            ["git", "ls-remote", url, f"refs/heads/{branch}"],
+            [
+                _git_path(),
+                "-c",
+                "protocol.version=2",
+                "ls-remote",
+                "--refs",
+                "--heads",
+                url,
+                *(f"refs/heads/{branch}" for branch in branches),
+            ],
             capture_output=True,
             text=True,
             timeout=30,
         )
-        if result.returncode != 0:
-            return None
-        line = result.stdout.strip().splitlines()[0] if result.stdout.strip() else ""
-        return line.split("\t")[0] if line else None
     except (subprocess.TimeoutExpired, OSError):
-        return None
+        return {}
+    if result.returncode != 0:
+        return {}
+    heads = {}
+    for line in result.stdout.splitlines():
+        sha, _, ref = line.partition("\t")
+        if ref.startswith("refs/heads/"):
+            heads[ref.removeprefix("refs/heads/")] = sha
+    return heads
 
 
 # ---------------------------------------------------------------------------
@@ -142,10 +303,449 @@ def get_remote_commit(url: str, branch: str) -> str | None:
 # ---------------------------------------------------------------------------
 
 
+_cache_locks: dict[Path, threading.Lock] = {}
+_cache_locks_guard = threading.Lock()
+
+
+def _cache_repo_path(url: str) -> Path:
+    """Return the shared bare-repo cache for a remote URL."""
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return config.get_cache_dir() / "refs" / f"{digest}.git"
+
+
+def _cache_lock(cache: Path) -> threading.Lock:
+    """Serialise fetch/extract on one cache repo (FETCH_HEAD is shared)."""
+    with _cache_locks_guard:
+        return _cache_locks.setdefault(cache, threading.Lock())
+
+
+def _fetch_into_cache(cache: Path, source: RefsSource) -> str | None:
+    """Fetch the tip of source.branch into the cache repo.
+
+    Creates the bare repo on first use. Blobs are filtered out here and only
+    fetched for the files `git archive` actually reads. Returns an error
+    message, or None on success.
+    """
+    if not (cache / "HEAD").exists():
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        init_result = subprocess.run(
+            [_git_path(), "init", "--bare", "--quiet", str(cache)],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        if init_result.returncode != 0:
+            return f"git init failed:\n{init_result.stderr.strip()}"
+
+    fetch_result = subprocess.run(
+        [
+            _git_path(),
+            "-C",
+            str(cache),
+            "fetch",
+            "--depth=1",
+            "--filter=blob:none",
+            source.url,
+            source.branch,
+        ],
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if fetch_result.returncode != 0:
+        return f"git fetch failed:\n{fetch_result.stderr.strip()}"
+    return None
+
+
+def _refs_cache_max_bytes() -> int:
+    """Size the refs cache is trimmed back to after a sync."""
+    try:
+        return int(
+            os.environ.get(REFS_CACHE_MAX_BYTES_ENV, DEFAULT_REFS_CACHE_MAX_BYTES)
+        )
+    except ValueError:
+        return DEFAULT_REFS_CACHE_MAX_BYTES
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _last_fetched(repo: Path) -> float:
+    """When the cache repo was last fetched into (git rewrites FETCH_HEAD)."""
+    for marker in (repo / "FETCH_HEAD", repo):
+        try:
+            return marker.stat().st_mtime
+        except OSError:
+            continue
+    return 0.0
+
+
+def _prune_refs_cache(keep: Iterable[Path] = ()) -> None:
+    """Evict least recently used cache repos until the cache fits its budget.
+
+    Repos in ``keep`` (the ones the current batch used) are never removed.
+    """
+    root = config.get_cache_dir() / "refs"
+    try:
+        repos = [p for p in root.iterdir() if p.suffix == ".git" and p.is_dir()]
+    except OSError:
+        return
+    keep = set(keep)
+    limit = _refs_cache_max_bytes()
+    sizes = {repo: _dir_size(repo) for repo in repos}
+    total = sum(sizes.values())
+    if total <= limit:
+        return
+    for repo in sorted(repos, key=_last_fetched):
+        if total <= limit:
+            break
+        if repo in keep:
+            continue
+        shutil.rmtree(repo, ignore_errors=True)
+        total -= sizes[repo]
+
+
+def _fetched_commit(cache: Path) -> str | None:
+    """Return the commit the last fetch into the cache repo left in FETCH_HEAD.
+
+    Only one branch is fetched, so its commit starts the file's first line;
+    reading it directly saves a `git rev-parse` per sync.
+    """
+    try:
+        with (cache / "FETCH_HEAD").open(encoding="utf-8") as f:
+            line = f.readline()
+    except OSError:
+        return None
+    return line.partition("\t")[0].strip() or None
+
+
+def _extract_to(cache: Path, path: str, dest_path: Path) -> str | None:
+    """Extract `path` at FETCH_HEAD from the cache repo into dest_path.
+
+    The tree is streamed from `git archive` into a staging directory next to
+    dest_path, which is then swapped into place with renames so a failed
+    sync never leaves a half-written directory. A `path` of "." or "" takes
+    the whole repository. Returns an error message, or None on success.
+    """
+    prefix = _archive_prefix(path)
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    # Not tempfile.mkdtemp: its 0700 mode would follow the swap into place,
+    # while mkdir gives the same umask-derived mode as the rest of the tree
+    staging = dest_path.parent / f".{dest_path.name}-{uuid.uuid4().hex}"
+    staging.mkdir()
+    try:
+        extracted = False
+        links: dict[str, str] = {}
+        proc = subprocess.Popen(
+            [_git_path(), "-C", str(cache), "archive", "--format=tar", "FETCH_HEAD"]
+            + (["/".join(prefix)] if prefix else []),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        try:
+            try:
+                with tarfile.open(fileobj=proc.stdout, mode="r|") as tar:
+                    for member in tar:
+                        extracted |= _extract_member(
+                            tar, member, prefix, staging, links
+                        )
+            except tarfile.ReadError:
+                pass
+            stderr = proc.stderr.read().decode("utf-8", errors="replace")
+            returncode = proc.wait(timeout=120)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            raise
+
+        if returncode != 0:
+            if "did not match any files" in stderr:
+                return f"Path '{path}' not found in repository."
+            return f"git archive failed:\n{stderr.strip()}"
+        if not extracted:
+            return f"Path '{path}' not found in repository."
+        error = _materialise_links(staging, links)
+        if error:
+            return error
+
+        _swap_into_place(staging, dest_path)
+        return None
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _archive_prefix(path: str) -> list[str]:
+    """Split a source path into archive path parts; [] is the whole tree."""
+    return [part for part in path.strip("/").split("/") if part not in ("", ".")]
+
+
+def _swap_into_place(staging: Path, dest_path: Path) -> None:
+    """Replace dest_path with staging using renames on the same filesystem.
+
+    If the second rename fails, the previous contents are moved back so the
+    destination is never left missing.
+    """
+    if not dest_path.exists():
+        os.replace(staging, dest_path)
+        return
+    old = dest_path.with_name(staging.name + ".old")
+    os.replace(dest_path, old)
+    try:
+        os.replace(staging, dest_path)
+    except OSError:
+        os.replace(old, dest_path)
+        raise
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def _extract_member(
+    tar: tarfile.TarFile,
+    member: tarfile.TarInfo,
+    prefix: list[str],
+    staging: Path,
+    links: dict[str, str],
+) -> bool:
+    """Write one archive member under staging, relative to prefix.
+
+    Symlinks are not written here but recorded in ``links`` (staged path to
+    link target) for _materialise_links, since their target may come later
+    in the stream.
+    """
+    parts = member.name.split("/")
+    if parts[: len(prefix)] != prefix:
+        return False
+    rel = [p for p in parts[len(prefix) :] if p]
+    if not rel:
+        return member.isdir()
+    if ".." in rel:
+        return False
+    target = staging.joinpath(*rel)
+    if member.isdir():
+        target.mkdir(parents=True, exist_ok=True)
+        return True
+    if member.issym():
+        links["/".join(rel)] = member.linkname
+        return True
+    if member.isfile():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fileobj = tar.extractfile(member)
+        if fileobj is not None:
+            # Stream in chunks rather than holding the whole file in memory
+            with target.open("wb") as out:
+                shutil.copyfileobj(fileobj, out)
+        if member.mode & 0o111:
+            # Executable like a checkout: x wherever the umask left r
+            mode = target.stat().st_mode
+            target.chmod(mode | (mode & 0o444) >> 2)
+        return True
+    return False
+
+
+def _materialise_links(staging: Path, links: dict[str, str]) -> str | None:
+    """Replace recorded symlinks with copies of their targets.
+
+    Matches the copy a checkout + copytree used to make. Targets must lie
+    inside the synced tree; links to links are resolved over several passes.
+    Returns an error message, or None on success.
+    """
+    pending = dict(links)
+    while pending:
+        progress = False
+        for rel, linkname in list(pending.items()):
+            resolved = posixpath.normpath(
+                posixpath.join(posixpath.dirname(rel), linkname)
+            )
+            if (
+                posixpath.isabs(linkname)
+                or resolved == ".."
+                or resolved.startswith("../")
+            ):
+                return f"Symlink '{rel}' points outside the synced path."
+            if resolved == "." or rel.startswith(resolved + "/"):
+                return f"Symlink loop at '{rel}'."
+            # Wait until the target, and any link inside it, is a real copy
+            if any(p == resolved or p.startswith(resolved + "/") for p in pending):
+                continue
+            source = staging / resolved
+            target = staging / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if source.is_dir():
+                shutil.copytree(source, target)
+            elif source.is_file():
+                shutil.copy2(source, target)
+            else:
+                return f"Symlink '{rel}' points to missing '{linkname}'."
+            del pending[rel]
+            progress = True
+        if not progress:
+            return f"Symlink loop at '{next(iter(pending))}'."
+    return None
+
+
+def _refs_ttl() -> float:
+    """Seconds a successful sync is trusted without asking the remote."""
+    try:
+        return float(os.environ.get(REFS_TTL_ENV, DEFAULT_REFS_TTL))
+    except ValueError:
+        return DEFAULT_REFS_TTL
+
+
+def _synced_within(source_state: dict, ttl: float) -> bool:
+    synced_at = source_state.get("synced_at")
+    if not synced_at or not source_state.get("last_commit"):
+        return False
+    try:
+        synced = datetime.fromisoformat(synced_at)
+    except ValueError:
+        return False
+    if synced.tzinfo is None:
+        synced = synced.replace(tzinfo=UTC)
+    return datetime.now(UTC) - synced < timedelta(seconds=ttl)
+
+
 def sync_source(
-    project_dir: Path, source: RefsSource, force: bool = False
+    project_dir: Path,
+    source: RefsSource,
+    force: bool = False,
+    cache_first: bool = False,
 ) -> SyncResult:
     """Sync a single source into .aftr/<local_dir>/."""
+    return sync_all(project_dir, [source], force=force, cache_first=cache_first)[0]
+
+
+def sync_all(
+    project_dir: Path,
+    sources: list[RefsSource],
+    force: bool = False,
+    max_workers: int = 8,
+    cache_first: bool = False,
+) -> list[SyncResult]:
+    """Sync several sources concurrently, returning results in source order.
+
+    Each source runs in its own worker thread (the time is spent waiting on
+    git subprocesses). Every remote lookup the batch needs is queued ahead of
+    the syncs so they all start at once, and sources that share a URL share
+    one `git ls-remote` covering all of their branches. Sources with no
+    recorded commit, and every source under ``force``, skip the lookup and
+    take the commit from their fetch. The state file is read once up front
+    and written once at the end, after merging every successful sync, and
+    the ``.aftr`` directory is created once before any worker starts.
+
+    Unless ``force`` is set, a source synced within the last AFTR_REFS_TTL
+    seconds (default 300) is reported up to date without contacting the
+    remote. ``cache_first`` extends that to any source with a recorded commit.
+    After a batch that changed anything, the shared repo cache is trimmed to
+    AFTR_REFS_CACHE_MAX_BYTES (default 2 GiB), least recently used first.
+    """
+    if not sources:
+        return []
+
+    aftr_dir = _aftr_dir(project_dir)
+    aftr_dir.mkdir(exist_ok=True)
+    state = load_refs_state(project_dir)
+    source_states = state.setdefault("sources", {})
+    lock = threading.Lock()
+    changed = False
+
+    # Decided once here: the TTL check is time-dependent, and a source whose
+    # lookup was not queued must not ask for one later
+    skip_remote = [
+        _skip_remote_check(source_states.get(source.name, {}), force, cache_first)
+        for source in sources
+    ]
+    branches_by_url: dict[str, list[str]] = {}
+    if _git_available():
+        for source, skip in zip(sources, skip_remote):
+            if (
+                skip
+                or _pinned_commit(source) is not None
+                or not _needs_remote_lookup(source_states.get(source.name, {}), force)
+            ):
+                continue
+            branches = branches_by_url.setdefault(source.url, [])
+            if source.branch not in branches:
+                branches.append(source.branch)
+
+    def run(source: RefsSource, skip: bool) -> SyncResult:
+        nonlocal changed
+        with lock:
+            source_state = dict(source_states.get(source.name, {}))
+        result, new_state = _sync_one(
+            project_dir, source, source_state, force, skip, remote_commit
+        )
+        if new_state is not None:
+            with lock:
+                source_states[source.name] = new_state
+                changed = True
+        return result
+
+    workers = max(1, min(max_workers, len(sources) + len(branches_by_url)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Submitted first, so every lookup is picked up before any sync waits on it
+        lookups = {
+            url: executor.submit(get_remote_commits, url, branches)
+            for url, branches in branches_by_url.items()
+        }
+
+        def remote_commit(source: RefsSource) -> str | None:
+            return lookups[source.url].result().get(source.branch)
+
+        futures = {
+            executor.submit(run, source, skip_remote[i]): i
+            for i, source in enumerate(sources)
+        }
+        by_index: dict[int, SyncResult] = {}
+        for future in as_completed(futures):
+            by_index[futures[future]] = future.result()
+    results = [by_index[i] for i in range(len(sources))]
+
+    if changed:
+        _write_refs_state(aftr_dir, state)
+        _prune_refs_cache(keep={_cache_repo_path(source.url) for source in sources})
+    return results
+
+
+def _pinned_commit(source: RefsSource) -> str | None:
+    """Return the commit a source is pinned to, or None if it tracks a branch.
+
+    A pinned commit never moves, so it needs no ls-remote and, once synced,
+    no fetch.
+    """
+    return source.branch if _PINNED_COMMIT.fullmatch(source.branch) else None
+
+
+def _needs_remote_lookup(source_state: dict, force: bool) -> bool:
+    """Whether an ls-remote could save the fetch (a commit to compare against)."""
+    return not force and bool(source_state.get("last_commit"))
+
+
+def _skip_remote_check(source_state: dict, force: bool, cache_first: bool) -> bool:
+    """Whether the recorded sync can be trusted without asking the remote."""
+    if force or not source_state.get("last_commit"):
+        return False
+    return cache_first or _synced_within(source_state, _refs_ttl())
+
+
+def _sync_one(
+    project_dir: Path,
+    source: RefsSource,
+    source_state: dict,
+    force: bool,
+    skip_remote: bool,
+    remote_commit: Callable[[RefsSource], str | None],
+) -> tuple[SyncResult, dict | None]:
+    """Sync one source without touching the state file.
+
+    ``skip_remote`` is sync_all's _skip_remote_check decision for the source.
+    Returns the result and, when files were updated, the new state entry.
+    """
     if not _git_available():
         return SyncResult(
             name=source.name,
@@ -154,104 +754,95 @@ def sync_source(
                 "git is required for refs sync. "
                 "Install git and ensure it is on your PATH."
             ),
-        )
+        ), None
 
-    # Check remote commit
-    remote_sha = get_remote_commit(source.url, source.branch)
-    if remote_sha is None:
+    pinned = _pinned_commit(source)
+    if pinned is not None and not force and source_state.get("last_commit") == pinned:
         return SyncResult(
             name=source.name,
-            status="error",
-            message=f"Could not reach remote '{source.url}' (branch: {source.branch}). "
-            "Check the URL, branch name, and your network connection.",
-        )
+            status="up_to_date",
+            message="Pinned commit already synced.",
+            commit=pinned,
+        ), None
 
-    # Compare with stored state
-    state = load_refs_state(project_dir)
-    source_state = state.get("sources", {}).get(source.name, {})
-    if not force and source_state.get("last_commit") == remote_sha:
+    # Trust a recent sync (or any sync, with cache_first) without a round-trip
+    if pinned is None and skip_remote:
         return SyncResult(
             name=source.name,
             status="up_to_date",
-            message="Already up to date.",
-            commit=remote_sha,
-        )
-
-    # Sparse-clone into temp dir
-    tmpdir = Path(tempfile.mkdtemp())
-    try:
-        clone_result = subprocess.run(
-            [
-                "git",
-                "clone",
-                "--depth=1",
-                "--filter=blob:none",
-                "--sparse",
-                "--branch",
-                source.branch,
-                source.url,
-                str(tmpdir),
-            ],
-            capture_output=True,
-            text=True,
-            timeout=120,
-        )
-        if clone_result.returncode != 0:
+            message="Synced recently; skipped remote check.",
+            commit=source_state["last_commit"],
+        ), None
+
+    # A first or forced sync fetches regardless of the remote tip, so it skips
+    # the ls-remote round-trip and reads the commit from the fetch instead
+    remote_sha = pinned
+    if pinned is None and _needs_remote_lookup(source_state, force):
+        remote_sha = remote_commit(source)
+        if remote_sha is None:
             return SyncResult(
                 name=source.name,
                 status="error",
-                message=f"git clone failed:\n{clone_result.stderr.strip()}",
-            )
+                message=f"Could not reach remote '{source.url}' "
+                f"(branch: {source.branch}). "
+                "Check the URL, branch name, and your network connection.",
+            ), None
 
-        checkout_result = subprocess.run(
-            ["git", "-C", str(tmpdir), "sparse-checkout", "set", source.path],
-            capture_output=True,
-            text=True,
-            timeout=60,
-        )
-        if checkout_result.returncode != 0:
+        # Compare with stored state
+        if source_state.get("last_commit") == remote_sha:
             return SyncResult(
                 name=source.name,
-                status="error",
-                message=f"git sparse-checkout failed:\n{checkout_result.stderr.strip()}",
-            )
-
-        # Copy files
-        src_path = tmpdir / source.path
-        if not src_path.exists():
-            return SyncResult(
-                name=source.name,
-                status="error",
-                message=f"Path '{source.path}' not found in repository.",
-            )
-
-        dest_path = _aftr_dir(project_dir) / source.local_dir
-        if dest_path.exists():
-            shutil.rmtree(dest_path)
-        shutil.copytree(src_path, dest_path)
+                status="up_to_date",
+                message="Already up to date.",
+                commit=remote_sha,
+            ), None
 
+    cache = _cache_repo_path(source.url)
+    dest_path = _aftr_dir(project_dir) / source.local_dir
+    try:
+        with _cache_lock(cache):
+            # The cache may already hold the pinned commit from another sync
+            if pinned is None or _fetched_commit(cache) != pinned:
+                error = _fetch_into_cache(cache, source)
+                if error:
+                    return SyncResult(
+                        name=source.name, status="error", message=error
+                    ), None
+            if remote_sha is None:
+                remote_sha = _fetched_commit(cache)
+                if remote_sha is None:
+                    return SyncResult(
+                        name=source.name,
+                        status="error",
+                        message=f"Could not resolve the fetched commit for "
+                        f"branch '{source.branch}'.",
+                    ), None
+            error = _extract_to(cache, source.path, dest_path)
+            if error:
+                return SyncResult(name=source.name, status="error", message=error), None
     except subprocess.TimeoutExpired:
         return SyncResult(
             name=source.name,
             status="error",
             message="git operation timed out.",
-        )
-    finally:
-        shutil.rmtree(tmpdir, ignore_errors=True)
+        ), None
+    except OSError as e:
+        return SyncResult(
+            name=source.name,
+            status="error",
+            message=f"Could not update {dest_path}: {e}",
+        ), None
 
-    # Update state
-    state.setdefault("sources", {})[source.name] = {
+    new_state = {
         "last_commit": remote_sha,
-        "synced_at": datetime.now(timezone.utc).isoformat(),
+        "synced_at": datetime.now(UTC).isoformat(),
     }
-    save_refs_state(project_dir, state)
-
     return SyncResult(
         name=source.name,
         status="updated",
         message="Synced successfully.",
         commit=remote_sha,
-    )
+    ), new_state
 
 
 # ---------------------------------------------------------------------------
@@ -262,15 +853,19 @@ def sync_source(
 def ensure_gitignore(project_dir: Path) -> None:
     """Add .aftr/.state.json to .gitignore if not already present."""
     gitignore_path = project_dir / ".gitignore"
-    if gitignore_path.exists():
-        content = gitignore_path.read_text(encoding="utf-8")
-        lines = content.splitlines()
-        if any(line.strip() == GITIGNORE_ENTRY for line in lines):
-            return
-        # Append with a trailing newline
-        separator = "\n" if content and not content.endswith("\n") else ""
-        gitignore_path.write_text(
-            content + separator + GITIGNORE_ENTRY + "\n", encoding="utf-8"
-        )
-    else:
-        gitignore_path.write_text(GITIGNORE_ENTRY + "\n", encoding="utf-8")
+    entry = GITIGNORE_ENTRY.encode()
+    try:
+        data = gitignore_path.read_bytes()
+    except FileNotFoundError:
+        gitignore_path.write_bytes(entry + b"\n")
+        return
+
+    # Substring check on the raw bytes first; only split into lines when the
+    # entry might be present
+    if entry in data and any(line.strip() == entry for line in data.splitlines()):
+        return
+    newline = b"\r\n" if b"\r\n" in data else b"\n"
+    with gitignore_path.open("ab") as f:
+        if data and not data.endswith(b"\n"):
+            f.write(newline)
+        f.write(entry + newline)
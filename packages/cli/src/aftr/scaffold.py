@@ -1,11 +1,18 @@
 """Project scaffolding logic using templates."""
 
+import functools
+import json
+import re
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from rich import print as rprint
 
 from aftr.template import Template
 
+_PLACEHOLDER_RE = re.compile(r"\{\{(project_name|module_name)\}\}")
+
 
 def render_template_string(content: str, project_name: str, module_name: str) -> str:
     """Render template placeholders in content.
@@ -18,14 +25,21 @@ def render_template_string(content: str, project_name: str, module_name: str) ->
     Returns:
         Content with placeholders replaced.
     """
-    return content.replace("{{project_name}}", project_name).replace(
-        "{{module_name}}", module_name
-    )
+    return _placeholder_renderer(project_name, module_name)(content)
+
+
+def _placeholder_renderer(project_name: str, module_name: str) -> Callable[[str], str]:
+    """Return a function that renders placeholders for one project."""
+    subs = {"project_name": project_name, "module_name": module_name}
+    return functools.partial(_PLACEHOLDER_RE.sub, lambda m: subs[m.group(1)])
 
 
 def scaffold_project(project_path: Path, project_name: str, template: Template) -> None:
     """Scaffold a new project using the given template.
 
+    Directories are created first; the files are then written concurrently
+    and reported in a fixed order once all writes have finished.
+
     Args:
         project_path: Path where the project will be created.
         project_name: Name of the project.
@@ -45,159 +59,138 @@ def scaffold_project(project_path: Path, project_name: str, template: Template)
         (project_path / dir_path).mkdir(parents=True, exist_ok=True)
         rprint(f"  [green]Created[/green] {dir_path}/")
 
-    # Generate pyproject.toml
-    _create_pyproject_toml(project_path, project_name, template)
-    rprint("  [green]Created[/green] pyproject.toml")
-
-    # Generate .mise.toml
-    _create_mise_toml(project_path, template)
-    rprint("  [green]Created[/green] .mise.toml")
-
-    # Create __init__.py
-    init_content = (
-        f'"""{project_name} - A data analysis project."""\n\n__version__ = "0.1.0"\n'
-    )
-    (project_path / "src" / module_name / "__init__.py").write_text(
-        init_content, encoding="utf-8"
-    )
-    rprint(f"  [green]Created[/green] src/{module_name}/__init__.py")
-
-    # Create example notebook if configured
+    # Collect every file as (display name, content); later entries win
+    files: list[tuple[str, str]] = [
+        ("pyproject.toml", _pyproject_toml_content(project_name, template)),
+        (".mise.toml", _mise_toml_content(template)),
+        (
+            f"src/{module_name}/__init__.py",
+            (
+                f'"""{project_name} - A data analysis project."""\n\n'
+                '__version__ = "0.1.0"\n'
+            ),
+        ),
+    ]
     if template.notebook_include_example:
-        _create_example_notebook(project_path, project_name, template)
-        rprint("  [green]Created[/green] notebooks/example.ipynb")
-
-    # Create additional files from template
+        files.append(
+            (
+                "notebooks/example.ipynb",
+                _example_notebook_content(project_name, template),
+            )
+        )
+    render = _placeholder_renderer(project_name, module_name)
     for file_path, content in template.files.items():
-        rendered_content = render_template_string(content, project_name, module_name)
-        full_path = project_path / file_path
+        files.append((file_path, render(content)))
 
-        # Ensure parent directory exists
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-
-        full_path.write_text(rendered_content, encoding="utf-8")
+    _write_files(project_path, files)
+    for file_path, _ in files:
         rprint(f"  [green]Created[/green] {file_path}")
 
 
-def _create_pyproject_toml(
-    project_path: Path, project_name: str, template: Template
-) -> None:
-    """Create pyproject.toml from template configuration."""
-    # Build dependencies list
-    deps = []
-    for pkg, ver in template.dependencies.items():
-        deps.append(f'    "{pkg}{ver}",')
-    deps_str = "\n".join(deps)
+def _write_files(project_path: Path, files: list[tuple[str, str]]) -> None:
+    """Write files concurrently, creating their parent directories first."""
+    contents = {project_path / file_path: content for file_path, content in files}
+    for parent in {path.parent for path in contents}:
+        parent.mkdir(parents=True, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(path.write_text, content, encoding="utf-8")
+            for path, content in contents.items()
+        ]
+    for future in futures:
+        future.result()
+
+
+def _pyproject_toml_content(project_name: str, template: Template) -> str:
+    """Build pyproject.toml from template configuration."""
+    lines = [
+        "[project]",
+        f'name = "{project_name}"',
+        'version = "0.1.0"',
+        'description = ""',
+        f'requires-python = "{template.requires_python}"',
+        "dependencies = [",
+    ]
+    lines.extend(f'    "{pkg}{ver}",' for pkg, ver in template.dependencies.items())
+    lines.append("]")
 
-    # Build dev dependencies if present
-    dev_deps_str = ""
+    # Dev dependencies if present
     if "dev" in template.optional_dependencies:
-        dev_deps = []
-        for dep in template.optional_dependencies["dev"]:
-            dev_deps.append(f'    "{dep}",')
-        dev_deps_str = f"""
-[tool.uv]
-dev-dependencies = [
-{chr(10).join(dev_deps)}
-]
-"""
-
-    # Build uv indexes
-    uv_indexes_str = ""
-    if template.uv_indexes:
-        for idx in template.uv_indexes:
-            parts = "\n".join(f'{k} = "{v}"' for k, v in idx.items())
-            uv_indexes_str += f"\n[[tool.uv.index]]\n{parts}\n"
-
-    # Build uv sources
-    uv_sources_str = ""
+        lines.extend(["", "[tool.uv]", "dev-dependencies = ["])
+        lines.extend(f'    "{dep}",' for dep in template.optional_dependencies["dev"])
+        lines.append("]")
+
+    # uv indexes
+    for idx in template.uv_indexes:
+        lines.extend(["", "[[tool.uv.index]]"])
+        lines.extend(f'{k} = "{v}"' for k, v in idx.items())
+
+    # uv sources
     if template.uv_sources:
-        source_lines = []
+        lines.extend(["", "[tool.uv.sources]"])
         for pkg, src in template.uv_sources.items():
             inline = ", ".join(f'{k} = "{v}"' for k, v in src.items())
-            source_lines.append(f"{pkg} = {{ {inline} }}")
-        uv_sources_str = "\n[tool.uv.sources]\n" + "\n".join(source_lines) + "\n"
-
-    content = f"""[project]
-name = "{project_name}"
-version = "0.1.0"
-description = ""
-requires-python = "{template.requires_python}"
-dependencies = [
-{deps_str}
-]
-{dev_deps_str}{uv_indexes_str}{uv_sources_str}"""
+            lines.append(f"{pkg} = {{ {inline} }}")
 
-    (project_path / "pyproject.toml").write_text(content, encoding="utf-8")
+    return "\n".join(lines) + "\n"
 
 
-def _create_mise_toml(project_path: Path, template: Template) -> None:
-    """Create .mise.toml from template configuration."""
+def _mise_toml_content(template: Template) -> str:
+    """Build .mise.toml from template configuration."""
     tools = template.mise_tools or {"uv": "latest"}
 
-    tools_lines = []
-    for tool, version in tools.items():
-        tools_lines.append(f'{tool} = "{version}"')
+    lines = ["[tools]"]
+    lines.extend(f'{tool} = "{version}"' for tool, version in tools.items())
+    lines.extend(["", "[settings]", "python.uv_venv_auto = true"])
+    return "\n".join(lines) + "\n"
 
-    content = f"""[tools]
-{chr(10).join(tools_lines)}
 
-[settings]
-python.uv_venv_auto = true
-"""
-
-    (project_path / ".mise.toml").write_text(content, encoding="utf-8")
-
-
-def _create_example_notebook(
-    project_path: Path, project_name: str, template: Template
-) -> None:
-    """Create example notebook with configured imports."""
-    # Build import statements
+def _example_notebook_content(project_name: str, template: Template) -> str:
+    """Build the example notebook with configured imports."""
     imports = template.notebook_imports or ["duckdb", "polars as pl"]
-    import_lines = [
-        f"import {imp}" if " as " not in imp else f"import {imp}" for imp in imports
-    ]
-    import_source = [f"{line}\\n" for line in import_lines[:-1]]
-    if import_lines:
-        import_source.append(f"{import_lines[-1]}")
-    import_source_str = ", ".join([f'"{s}"' for s in import_source])
-
-    notebook_content = f"""{{
- "cells": [
-  {{
-   "cell_type": "markdown",
-   "metadata": {{}},
-   "source": ["# {project_name}\\n", "\\n", "Example notebook for papermill."]
-  }},
-  {{
-   "cell_type": "code",
-   "execution_count": null,
-   "metadata": {{
-    "tags": ["parameters"]
-   }},
-   "outputs": [],
-   "source": ["# Parameters (tagged for papermill)\\n", "input_path = \\"data/input.csv\\"\\n", "output_path = \\"outputs/result.parquet\\""]
-  }},
-  {{
-   "cell_type": "code",
-   "execution_count": null,
-   "metadata": {{}},
-   "outputs": [],
-   "source": [{import_source_str}]
-  }}
- ],
- "metadata": {{
-  "kernelspec": {{
-   "display_name": "Python 3",
-   "language": "python",
-   "name": "python3"
-  }}
- }},
- "nbformat": 4,
- "nbformat_minor": 4
-}}"""
-
-    (project_path / "notebooks" / "example.ipynb").write_text(
-        notebook_content, encoding="utf-8"
-    )
+    import_source = [f"import {imp}\n" for imp in imports[:-1]]
+    import_source.append(f"import {imports[-1]}")
+
+    notebook = {
+        "cells": [
+            {
+                "cell_type": "markdown",
+                "metadata": {},
+                "source": [
+                    f"# {project_name}\n",
+                    "\n",
+                    "Example notebook for papermill.",
+                ],
+            },
+            {
+                "cell_type": "code",
+                "execution_count": None,
+                "metadata": {"tags": ["parameters"]},
+                "outputs": [],
+                "source": [
+                    "# Parameters (tagged for papermill)\n",
+                    'input_path = "data/input.csv"\n',
+                    'output_path = "outputs/result.parquet"',
+                ],
+            },
+            {
+                "cell_type": "code",
+                "execution_count": None,
+                "metadata": {},
+                "outputs": [],
+                "source": import_source,
+            },
+        ],
+        "metadata": {
+            "kernelspec": {
+                "display_name": "Python 3",
+                "language": "python",
+                "name": "python3",
+            }
+        },
+        "nbformat": 4,
+        "nbformat_minor": 4,
+    }
+
+    return json.dumps(notebook, indent=1) + "\n"
@@ -1,16 +1,16 @@
 """Template model and loading functionality."""
 
+import functools
+import tomllib
 from dataclasses import dataclass, field
 from importlib import resources
 from pathlib import Path
 from typing import Optional
 
-import tomlkit
-
 from aftr import config
 
 
-@dataclass
+@dataclass(slots=True)
 class Template:
     """Represents a project template configuration."""
 
@@ -52,8 +52,11 @@ def parse_template(content: str) -> Template:
     Returns:
         Parsed Template object.
     """
-    doc = tomlkit.parse(content)
+    return _template_from_doc(tomllib.loads(content))
+
 
+def _template_from_doc(doc: dict) -> Template:
+    """Build a Template from an already-parsed TOML document."""
     # Extract template metadata
     template_section = doc.get("template", {})
     name = template_section.get("name", "unnamed")
@@ -129,17 +132,20 @@ def parse_template(content: str) -> Template:
     )
 
 
+@functools.cache
 def load_default_template() -> Template:
     """Load the built-in default template.
 
+    The bundled file never changes while the process runs, so the parsed
+    template is cached. Callers must treat it as read-only.
+
     Returns:
         The default Template object.
     """
     # Use importlib.resources to load the bundled template
     template_files = resources.files("aftr.templates")
-    default_toml = template_files.joinpath("default.toml")
-    content = default_toml.read_text(encoding="utf-8")
-    return parse_template(content)
+    with template_files.joinpath("default.toml").open("rb") as f:
+        return _template_from_doc(tomllib.load(f))
 
 
 def load_template(name: str) -> Optional[Template]:
@@ -155,12 +161,12 @@ def load_template(name: str) -> Optional[Template]:
         return load_default_template()
 
     template_path = config.get_template_path(name)
-    if not template_path.exists():
+    try:
+        with open(template_path, "rb") as f:
+            return _template_from_doc(tomllib.load(f))
+    except FileNotFoundError:
         return None
 
-    content = template_path.read_text(encoding="utf-8")
-    return parse_template(content)
-
 
 def save_template(name: str, content: str) -> Path:
     """Save a template to the templates directory.
@@ -178,6 +184,7 @@ def save_template(name: str, content: str) -> Path:
     return template_path
 
 
+@functools.cache
 def get_default_template_content() -> str:
     """Get the raw content of the default template.
 
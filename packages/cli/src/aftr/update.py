@@ -1,41 +1,129 @@
 """Update checking functionality for aftr CLI."""
 
+import atexit
+import importlib.util
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
 import httpx
 from packaging.version import Version, InvalidVersion
 from rich.console import Console
 from rich.panel import Panel
 
-from aftr import __version__
+from aftr import __version__, config
 
 console = Console()
 
+PYPI_URL = "https://pypi.org/pypi/aftr/json"
+PYPI_CACHE_FILE = "pypi_latest.json"
+PYPI_CACHE_TTL = 6 * 60 * 60  # seconds
+
+_client: httpx.Client | None = None
+
+
+def _get_client() -> httpx.Client:
+    """Return the shared PyPI client, creating it on first use.
+
+    Reusing one client keeps the connection alive between requests. HTTP/2
+    is used when the optional h2 package is installed.
+    """
+    global _client
+    if _client is None:
+        _client = httpx.Client(
+            http2=importlib.util.find_spec("h2") is not None,
+            follow_redirects=True,
+            headers={
+                "Accept": "application/json",
+                "User-Agent": f"aftr/{__version__}",
+            },
+        )
+        atexit.register(_client.close)
+    return _client
+
 
 def get_installed_version() -> str:
     """Return the currently installed version."""
     return __version__
 
 
+def _pypi_cache_path() -> Path:
+    return config.get_cache_dir() / PYPI_CACHE_FILE
+
+
+def _read_pypi_cache(cache_path: Path) -> dict:
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return cached if isinstance(cached, dict) else {}
+
+
+def _write_pypi_cache(cache_path: Path, cached: dict) -> None:
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(cached), encoding="utf-8")
+    except OSError:
+        pass
+
+
 def get_latest_version(timeout: float = 3.0) -> str | None:
     """Query PyPI for the latest version of aftr.
 
+    The answer is cached on disk. Within PYPI_CACHE_TTL the cached version is
+    returned without a request; after that PyPI is asked again with
+    If-None-Match / If-Modified-Since, so an unchanged release costs a 304.
+
     Args:
         timeout: Request timeout in seconds.
 
     Returns:
         Latest version string or None if request fails.
     """
+    cache_path = _pypi_cache_path()
+    cached = _read_pypi_cache(cache_path)
+    cached_version = cached.get("version")
+    headers = {}
+    if cached_version:
+        try:
+            age = time.time() - cache_path.stat().st_mtime
+        except OSError:
+            age = PYPI_CACHE_TTL
+        if 0 <= age < PYPI_CACHE_TTL:
+            return cached_version
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
     try:
-        response = httpx.get(
-            "https://pypi.org/pypi/aftr/json",
-            timeout=timeout,
-            follow_redirects=True,
-        )
+        response = _get_client().get(PYPI_URL, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached_version:
+            try:
+                os.utime(cache_path)
+            except OSError:
+                pass
+            return cached_version
         response.raise_for_status()
         data = response.json()
-        return data.get("info", {}).get("version")
+        latest = data.get("info", {}).get("version")
     except (httpx.HTTPError, KeyError, ValueError):
         return None
 
+    if latest:
+        _write_pypi_cache(
+            cache_path,
+            {
+                "version": latest,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            },
+        )
+    return latest
+
 
 def check_for_update(timeout: float = 3.0) -> dict | None:
     """Check if an update is available.
@@ -66,6 +154,45 @@ def check_for_update(timeout: float = 3.0) -> dict | None:
         return None
 
 
+def start_background_update_check(timeout: float = 3.0) -> queue.Queue:
+    """Run check_for_update on a daemon thread.
+
+    The result of the check (a dict, or None if it failed) is put on the
+    returned queue when it arrives, so the CLI never waits on PyPI. If the
+    process exits first, the next run still benefits from the on-disk cache
+    the check fills in.
+
+    Args:
+        timeout: Request timeout in seconds.
+
+    Returns:
+        Queue that will receive the update info.
+    """
+    results: queue.Queue = queue.Queue(maxsize=1)
+
+    def run() -> None:
+        try:
+            results.put(check_for_update(timeout=timeout))
+        except Exception:
+            results.put(None)
+
+    threading.Thread(target=run, name="aftr-update-check", daemon=True).start()
+    return results
+
+
+def take_update_result(results: queue.Queue, wait: float = 0.0) -> dict | None:
+    """Return the background check's result, or None if it has not arrived.
+
+    Args:
+        results: Queue returned by start_background_update_check.
+        wait: Seconds to wait for the result before giving up.
+    """
+    try:
+        return results.get(timeout=wait) if wait > 0 else results.get_nowait()
+    except queue.Empty:
+        return None
+
+
 def show_update_banner(update_info: dict) -> None:
     """Display an update notification or up-to-date confirmation.
 
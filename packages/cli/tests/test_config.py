@@ -0,0 +1,72 @@
+"""Tests for the aftr template registry."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from aftr import config
+
+
+@pytest.fixture
+def config_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point aftr's config directory at a temp dir."""
+    config_dir = tmp_path / "config"
+    monkeypatch.setattr(config, "get_config_dir", lambda: config_dir)
+    return config_dir
+
+
+class TestRegistry:
+    def test_missing_registry_is_empty(self, config_dir: Path) -> None:
+        assert config.load_registry() == {"templates": {}}
+
+    def test_register_then_lookup(self, config_dir: Path) -> None:
+        config.register_template("alpha", "https://example.com/alpha.toml")
+
+        assert config.get_template_source_url("alpha") == (
+            "https://example.com/alpha.toml"
+        )
+        assert "alpha" in config.get_registered_templates()
+        assert "alpha" in (config_dir / "registry.toml").read_text(encoding="utf-8")
+
+    def test_unregister(self, config_dir: Path) -> None:
+        config.register_template("alpha")
+
+        assert config.unregister_template("alpha") is True
+        assert config.unregister_template("alpha") is False
+        assert config.get_registered_templates() == {}
+
+    def test_reuses_parse_while_file_unchanged(
+        self, config_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        config.register_template("alpha")
+        config.load_registry()
+        monkeypatch.setattr(config.tomllib, "load", pytest.fail)
+
+        assert "alpha" in config.get_registered_templates()
+
+    def test_failed_save_leaves_cache_unchanged(
+        self, config_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        config.register_template("alpha")
+
+        def fail_write(*args, **kwargs) -> None:
+            raise OSError("disk full")
+
+        monkeypatch.setattr(Path, "write_text", fail_write)
+        with pytest.raises(OSError):
+            config.register_template("beta")
+
+        assert list(config.get_registered_templates()) == ["alpha"]
+
+    def test_picks_up_external_edits(self, config_dir: Path) -> None:
+        config.register_template("alpha")
+        config.load_registry()
+
+        (config_dir / "registry.toml").write_text(
+            '[templates.beta]\nsource_url = "https://example.com/beta.toml"\n',
+            encoding="utf-8",
+        )
+
+        assert list(config.get_registered_templates()) == ["beta"]
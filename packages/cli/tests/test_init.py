@@ -6,7 +6,9 @@ from pathlib import Path
 import pytest
 from typer.testing import CliRunner
 
+from aftr import template as template_module
 from aftr.cli import app
+from aftr.scaffold import _example_notebook_content, render_template_string
 
 runner = CliRunner()
 
@@ -16,19 +18,19 @@ class TestCli:
 
     def test_help(self) -> None:
         """CLI shows help when invoked with --help."""
-        result = runner.invoke(app, ["--help"])
+        result = runner.invoke(app, ["--help"], catch_exceptions=False)
         assert result.exit_code == 0
         assert "init" in result.stdout
 
     def test_init_help(self) -> None:
         """Init command shows help when invoked with --help."""
-        result = runner.invoke(app, ["init", "--help"])
+        result = runner.invoke(app, ["init", "--help"], catch_exceptions=False)
         assert result.exit_code == 0
         assert "Scaffold a new Python data project" in result.stdout
 
     def test_init_missing_name_shows_error(self) -> None:
         """Init shows error when NAME is missing."""
-        result = runner.invoke(app, ["init"])
+        result = runner.invoke(app, ["init"], catch_exceptions=False)
         # Typer shows usage info when required arg is missing
         assert result.exit_code != 0 or "NAME" in result.stdout
 
@@ -38,13 +40,17 @@ class TestInitCommand:
 
     def test_creates_project_directory(self, tmp_path: Path) -> None:
         """Init creates the project directory."""
-        result = runner.invoke(app, ["init", "my-project", "--path", str(tmp_path)])
+        result = runner.invoke(
+            app, ["init", "my-project", "--path", str(tmp_path)], catch_exceptions=False
+        )
         assert result.exit_code == 0
         assert (tmp_path / "my-project").is_dir()
 
     def test_creates_directory_structure(self, tmp_path: Path) -> None:
         """Init creates all expected directories."""
-        runner.invoke(app, ["init", "test-proj", "--path", str(tmp_path)])
+        runner.invoke(
+            app, ["init", "test-proj", "--path", str(tmp_path)], catch_exceptions=False
+        )
 
         project = tmp_path / "test-proj"
         assert (project / "notebooks").is_dir()
@@ -54,7 +60,9 @@ class TestInitCommand:
 
     def test_creates_mise_toml(self, tmp_path: Path) -> None:
         """Init creates .mise.toml with correct tools."""
-        runner.invoke(app, ["init", "myproj", "--path", str(tmp_path)])
+        runner.invoke(
+            app, ["init", "myproj", "--path", str(tmp_path)], catch_exceptions=False
+        )
 
         mise = tmp_path / "myproj" / ".mise.toml"
         assert mise.exists()
@@ -64,7 +72,9 @@ class TestInitCommand:
 
     def test_creates_gitignore(self, tmp_path: Path) -> None:
         """Init creates .gitignore with expected patterns."""
-        runner.invoke(app, ["init", "proj", "--path", str(tmp_path)])
+        runner.invoke(
+            app, ["init", "proj", "--path", str(tmp_path)], catch_exceptions=False
+        )
 
         gitignore = tmp_path / "proj" / ".gitignore"
         assert gitignore.exists()
@@ -77,7 +87,9 @@ class TestInitCommand:
 
     def test_creates_init_py(self, tmp_path: Path) -> None:
         """Init creates __init__.py in the src module."""
-        runner.invoke(app, ["init", "my-pkg", "--path", str(tmp_path)])
+        runner.invoke(
+            app, ["init", "my-pkg", "--path", str(tmp_path)], catch_exceptions=False
+        )
 
         init_py = tmp_path / "my-pkg" / "src" / "my_pkg" / "__init__.py"
         assert init_py.exists()
@@ -87,7 +99,9 @@ class TestInitCommand:
 
     def test_creates_example_notebook(self, tmp_path: Path) -> None:
         """Init creates a valid Jupyter notebook."""
-        runner.invoke(app, ["init", "nb-project", "--path", str(tmp_path)])
+        runner.invoke(
+            app, ["init", "nb-project", "--path", str(tmp_path)], catch_exceptions=False
+        )
 
         notebook = tmp_path / "nb-project" / "notebooks" / "example.ipynb"
         assert notebook.exists()
@@ -105,9 +119,27 @@ class TestInitCommand:
         ]
         assert len(cells_with_params) == 1
 
+        # Imports cell is one source line per import
+        assert content["cells"][2]["source"] == [
+            "import duckdb\n",
+            "import polars as pl",
+        ]
+
+    def test_notebook_escapes_project_name(self) -> None:
+        """Characters that need JSON escaping don't corrupt the notebook."""
+        template = template_module.load_default_template()
+        notebook = _example_notebook_content('say "hi" \\ bye', template)
+
+        content = json.loads(notebook)
+        assert content["cells"][0]["source"][0] == '# say "hi" \\ bye\n'
+
     def test_creates_readme(self, tmp_path: Path) -> None:
         """Init creates README.md with project info."""
-        runner.invoke(app, ["init", "readme-test", "--path", str(tmp_path)])
+        runner.invoke(
+            app,
+            ["init", "readme-test", "--path", str(tmp_path)],
+            catch_exceptions=False,
+        )
 
         readme = tmp_path / "readme-test" / "README.md"
         assert readme.exists()
@@ -118,7 +150,11 @@ class TestInitCommand:
 
     def test_hyphenated_name_converts_to_underscore(self, tmp_path: Path) -> None:
         """Hyphens in project name are converted to underscores for module."""
-        runner.invoke(app, ["init", "my-data-project", "--path", str(tmp_path)])
+        runner.invoke(
+            app,
+            ["init", "my-data-project", "--path", str(tmp_path)],
+            catch_exceptions=False,
+        )
 
         # Directory uses hyphens
         assert (tmp_path / "my-data-project").is_dir()
@@ -135,7 +171,9 @@ class TestInitErrors:
         existing.mkdir()
 
         result = runner.invoke(
-            app, ["init", "existing-project", "--path", str(tmp_path)]
+            app,
+            ["init", "existing-project", "--path", str(tmp_path)],
+            catch_exceptions=False,
         )
         assert result.exit_code == 1
         assert "already exists" in result.stdout
@@ -147,7 +185,11 @@ class TestInitErrors:
         existing.mkdir()
         (existing / "some-file.txt").write_text("content")
 
-        result = runner.invoke(app, ["init", "has-content", "--path", str(tmp_path)])
+        result = runner.invoke(
+            app,
+            ["init", "has-content", "--path", str(tmp_path)],
+            catch_exceptions=False,
+        )
         assert result.exit_code == 1
 
 
@@ -160,7 +202,27 @@ class TestInitWithDefaultPath:
         """Init creates project in current directory when no path specified."""
         monkeypatch.chdir(tmp_path)
 
-        result = runner.invoke(app, ["init", "default-path-proj"])
+        result = runner.invoke(
+            app, ["init", "default-path-proj"], catch_exceptions=False
+        )
         assert result.exit_code == 0
         assert (tmp_path / "default-path-proj").is_dir()
         assert (tmp_path / "default-path-proj" / "pyproject.toml").exists()
+
+
+class TestRenderTemplateString:
+    """Test placeholder substitution in template files."""
+
+    def test_replaces_both_placeholders(self) -> None:
+        rendered = render_template_string(
+            "# {{project_name}}\nimport {{module_name}}\n{{other}}",
+            "my-proj",
+            "my_proj",
+        )
+        assert rendered == "# my-proj\nimport my_proj\n{{other}}"
+
+    def test_substituted_values_are_not_rendered_again(self) -> None:
+        rendered = render_template_string(
+            "{{project_name}}", "{{module_name}}", "my_proj"
+        )
+        assert rendered == "{{module_name}}"
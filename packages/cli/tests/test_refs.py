@@ -2,7 +2,17 @@
 
 from __future__ import annotations
 
+import dataclasses
+import io
+import json
+import os
+import stat
 import subprocess
+import tarfile
+import threading
+import tomllib
+from collections.abc import Iterator
+from datetime import UTC, datetime
 from pathlib import Path
 from subprocess import TimeoutExpired
 from unittest.mock import MagicMock, patch
@@ -15,12 +25,19 @@ from aftr.refs import (
     GITIGNORE_ENTRY,
     RefsSource,
     SyncResult,
+    _cache_repo_path,
+    _git_path,
+    _prune_refs_cache,
+    _write_refs_state,
     ensure_gitignore,
+    find_refs_source,
     get_remote_commit,
+    get_remote_commits,
     load_refs_config,
     load_refs_state,
     save_refs_config,
     save_refs_state,
+    sync_all,
     sync_source,
 )
 
@@ -53,6 +70,81 @@ def project_with_source(project_dir: Path) -> Path:
     return project_dir
 
 
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep the shared refs repo cache out of the real user cache."""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr("aftr.config.get_cache_dir", lambda: cache_dir)
+    return cache_dir
+
+
+@pytest.fixture(autouse=True)
+def no_pygit2(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Use the git CLI path even when the optional pygit2 is installed."""
+    monkeypatch.setattr("aftr.refs._pygit2", lambda: None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_git_lookup() -> Iterator[None]:
+    """Some tests patch shutil.which, so don't reuse a cached lookup."""
+    _git_path.cache_clear()
+    yield
+    _git_path.cache_clear()
+
+
+def _result(
+    returncode: int = 0, stdout: str = "", stderr: str = ""
+) -> subprocess.CompletedProcess[str]:
+    """What subprocess.run returns for a finished git command."""
+    return subprocess.CompletedProcess([], returncode, stdout, stderr)
+
+
+def _ok() -> subprocess.CompletedProcess[str]:
+    return _result()
+
+
+def _fetched(source: RefsSource, sha: str) -> subprocess.CompletedProcess[str]:
+    """Result of a `git fetch` that left sha in the cache repo's FETCH_HEAD."""
+    cache = _cache_repo_path(source.url)
+    cache.mkdir(parents=True, exist_ok=True)
+    (cache / "FETCH_HEAD").write_text(
+        f"{sha}\t\tbranch '{source.branch}' of {source.url}\n"
+    )
+    return _ok()
+
+
+def _archive(
+    files: dict[str, str] | None,
+    returncode: int = 0,
+    stderr: str = "",
+    links: dict[str, str] | None = None,
+    executable: tuple[str, ...] = (),
+) -> MagicMock:
+    """A fake `git archive` process streaming a tar of ``files``.
+
+    ``links`` maps symlink names to their targets; names in ``executable``
+    get mode 0755.
+    """
+    buf = io.BytesIO()
+    if files is not None:
+        with tarfile.open(fileobj=buf, mode="w") as tar:
+            for name, target in (links or {}).items():
+                info = tarfile.TarInfo(name)
+                info.type = tarfile.SYMTYPE
+                info.linkname = target
+                tar.addfile(info)
+            for name, text in files.items():
+                data = text.encode("utf-8")
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mode = 0o755 if name in executable else 0o644
+                tar.addfile(info, io.BytesIO(data))
+    buf.seek(0)
+    proc = MagicMock(stdout=buf, stderr=io.BytesIO(stderr.encode("utf-8")))
+    proc.wait.return_value = returncode
+    return proc
+
+
 # ---------------------------------------------------------------------------
 # Layer 1 — Unit tests
 # ---------------------------------------------------------------------------
@@ -83,6 +175,32 @@ class TestConfigIO:
         assert loaded[1].name == "beta"
         assert loaded[1].branch == "dev"
 
+    def test_load_refs_config_caches_until_saved(self, project_dir: Path) -> None:
+        save_refs_config(project_dir, [RefsSource(name="alpha", url="u", path="p")])
+
+        with patch("aftr.refs.tomllib.load", wraps=tomllib.load) as parse:
+            first = load_refs_config(project_dir)
+            first.append(RefsSource(name="beta", url="u", path="p"))
+            assert [s.name for s in load_refs_config(project_dir)] == ["alpha"]
+            assert parse.call_count == 1
+
+            save_refs_config(project_dir, first)
+            assert [s.name for s in load_refs_config(project_dir)] == ["alpha", "beta"]
+            assert parse.call_count == 2
+
+    def test_refs_source_is_frozen(self) -> None:
+        source = RefsSource(name="alpha", url="u", path="p")
+        assert source.local_dir == "alpha"
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            source.branch = "dev"  # type: ignore[misc]
+
+    def test_find_refs_source(self) -> None:
+        alpha = RefsSource(name="alpha", url="u", path="p")
+        beta = RefsSource(name="beta", url="u", path="p")
+
+        assert find_refs_source([alpha, beta], "beta") is beta
+        assert find_refs_source([alpha, beta], "gamma") is None
+
     def test_load_refs_config_optional_local_dir(self, project_dir: Path) -> None:
         """When local_dir is absent from TOML, it defaults to name."""
         aftr_dir = project_dir / ".aftr"
@@ -101,13 +219,25 @@ class TestStateIO:
         state = load_refs_state(project_dir)
         assert state == {"sources": {}}
 
-    def test_load_refs_state_corrupt_json(self, project_dir: Path) -> None:
+    @pytest.mark.parametrize("stdlib_json", [False, True], ids=["default", "stdlib"])
+    def test_load_refs_state_corrupt_json(
+        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch, stdlib_json: bool
+    ) -> None:
+        if stdlib_json:
+            monkeypatch.setattr("aftr.refs._json_loads", json.loads)
         aftr_dir = project_dir / ".aftr"
         aftr_dir.mkdir()
         (aftr_dir / ".state.json").write_text("not valid json{{{", encoding="utf-8")
         state = load_refs_state(project_dir)
         assert state == {"sources": {}}
 
+    def test_saved_state_matches_stdlib_format(self, project_dir: Path) -> None:
+        """The file is the same whichever JSON library wrote it."""
+        state = {"sources": {"guides": {"last_commit": "abc", "note": "café"}}}
+        save_refs_state(project_dir, state)
+        written = (project_dir / ".aftr" / ".state.json").read_bytes()
+        assert written == json.dumps(state, indent=2, ensure_ascii=False).encode()
+
     def test_save_then_load_refs_state(self, project_dir: Path) -> None:
         state = {
             "sources": {
@@ -122,6 +252,12 @@ class TestStateIO:
         assert loaded["sources"]["guides"]["last_commit"] == "abc123def456"
         assert loaded["sources"]["guides"]["synced_at"] == "2024-01-15T10:30:00+00:00"
 
+    def test_save_refs_state_keeps_non_ascii_names(self, project_dir: Path) -> None:
+        save_refs_state(project_dir, {"sources": {"guías": {"last_commit": "abc"}}})
+        raw = (project_dir / ".aftr" / ".state.json").read_text(encoding="utf-8")
+        assert "guías" in raw
+        assert load_refs_state(project_dir)["sources"]["guías"]["last_commit"] == "abc"
+
 
 class TestEnsureGitignore:
     def test_ensure_gitignore_creates_file(self, project_dir: Path) -> None:
@@ -144,6 +280,20 @@ class TestEnsureGitignore:
         content = (project_dir / ".gitignore").read_text()
         assert content.count(GITIGNORE_ENTRY) == 1
 
+    def test_ensure_gitignore_adds_newline_before_entry(
+        self, project_dir: Path
+    ) -> None:
+        gitignore = project_dir / ".gitignore"
+        gitignore.write_text("*.pyc", encoding="utf-8")
+        ensure_gitignore(project_dir)
+        assert gitignore.read_text() == f"*.pyc\n{GITIGNORE_ENTRY}\n"
+
+    def test_ensure_gitignore_matches_whole_line(self, project_dir: Path) -> None:
+        gitignore = project_dir / ".gitignore"
+        gitignore.write_text(f"# {GITIGNORE_ENTRY}\n", encoding="utf-8")
+        ensure_gitignore(project_dir)
+        assert gitignore.read_text().splitlines()[-1] == GITIGNORE_ENTRY
+
     def test_ensure_gitignore_preserves_existing_content(
         self, project_dir: Path
     ) -> None:
@@ -155,48 +305,114 @@ class TestEnsureGitignore:
         assert "build/" in content
         assert GITIGNORE_ENTRY in content
 
+    def test_ensure_gitignore_keeps_crlf_line_endings(self, project_dir: Path) -> None:
+        gitignore = project_dir / ".gitignore"
+        gitignore.write_bytes(b"*.log\r\nbuild/")
+        ensure_gitignore(project_dir)
+        assert gitignore.read_bytes() == (
+            b"*.log\r\nbuild/\r\n" + GITIGNORE_ENTRY.encode() + b"\r\n"
+        )
+
 
 class TestGetRemoteCommit:
     def test_get_remote_commit_success(self) -> None:
-        mock_result = MagicMock(returncode=0, stdout="abc123\trefs/heads/main\n")
+        mock_result = _result(returncode=0, stdout="abc123\trefs/heads/main\n")
         with (
-            patch("aftr.refs.shutil.which", return_value="/usr/bin/git"),
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
             patch("aftr.refs.subprocess.run", return_value=mock_result),
         ):
             sha = get_remote_commit("https://example.com/repo", "main")
         assert sha == "abc123"
 
     def test_get_remote_commit_nonzero(self) -> None:
-        mock_result = MagicMock(returncode=1, stdout="")
+        mock_result = _result(returncode=1, stdout="")
         with (
-            patch("aftr.refs.shutil.which", return_value="/usr/bin/git"),
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
             patch("aftr.refs.subprocess.run", return_value=mock_result),
         ):
             sha = get_remote_commit("https://example.com/repo", "main")
         assert sha is None
 
     def test_get_remote_commit_empty_stdout(self) -> None:
-        mock_result = MagicMock(returncode=0, stdout="")
+        mock_result = _result(returncode=0, stdout="")
         with (
-            patch("aftr.refs.shutil.which", return_value="/usr/bin/git"),
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
             patch("aftr.refs.subprocess.run", return_value=mock_result),
         ):
             sha = get_remote_commit("https://example.com/repo", "main")
         assert sha is None
 
     def test_get_remote_commit_git_not_found(self) -> None:
-        with patch("aftr.refs.shutil.which", return_value=None):
+        with patch("aftr.refs._git_path", return_value=None):
             sha = get_remote_commit("https://example.com/repo", "main")
         assert sha is None
 
     def test_get_remote_commit_timeout(self) -> None:
         with (
-            patch("aftr.refs.shutil.which", return_value="/usr/bin/git"),
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
             patch("aftr.refs.subprocess.run", side_effect=TimeoutExpired("git", 30)),
         ):
             sha = get_remote_commit("https://example.com/repo", "main")
         assert sha is None
 
+    def test_git_lookup_is_cached(self) -> None:
+        mock_result = _result(returncode=0, stdout="abc123\trefs/heads/main\n")
+        with (
+            patch("aftr.refs.shutil.which", return_value="/usr/bin/git") as which,
+            patch("aftr.refs.subprocess.run", return_value=mock_result) as mock_run,
+        ):
+            get_remote_commit("https://example.com/repo", "main")
+            get_remote_commit("https://example.com/other", "main")
+        which.assert_called_once_with("git")
+        assert mock_run.call_args[0][0][0] == "/usr/bin/git"
+
+
+class TestGetRemoteCommits:
+    def test_parses_all_heads(self) -> None:
+        mock_result = _result(
+            returncode=0,
+            stdout="aaa\trefs/heads/main\nbbb\trefs/heads/feature/x\n",
+        )
+        with (
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch("aftr.refs.subprocess.run", return_value=mock_result) as mock_run,
+        ):
+            heads = get_remote_commits("https://example.com/repo")
+        assert heads == {"main": "aaa", "feature/x": "bbb"}
+        assert mock_run.call_args[0][0] == [
+            "/usr/bin/git",
+            "-c",
+            "protocol.version=2",
+            "ls-remote",
+            "--refs",
+            "--heads",
+            "https://example.com/repo",
+        ]
+
+    def test_limits_to_requested_branches(self) -> None:
+        mock_result = _result(returncode=0, stdout="aaa\trefs/heads/main\n")
+        with (
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch("aftr.refs.subprocess.run", return_value=mock_result) as mock_run,
+        ):
+            get_remote_commits("https://example.com/repo", ["main", "dev"])
+        assert mock_run.call_args[0][0][-2:] == ["refs/heads/main", "refs/heads/dev"]
+
+    def test_prefers_pygit2_listing(self) -> None:
+        with (
+            patch("aftr.refs._ls_remote_pygit2", return_value={"main": "aaa"}),
+            patch("aftr.refs.subprocess.run") as mock_run,
+        ):
+            assert get_remote_commits("https://example.com/repo") == {"main": "aaa"}
+        mock_run.assert_not_called()
+
+    def test_failure_is_empty(self) -> None:
+        with (
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch("aftr.refs.subprocess.run", return_value=_result(returncode=128)),
+        ):
+            assert get_remote_commits("https://example.com/repo") == {}
+
 
 class TestSyncSource:
     def _make_source(self, **kwargs) -> RefsSource:
@@ -220,16 +436,62 @@ class TestSyncSource:
             },
         )
         with (
-            patch("aftr.refs.shutil.which", return_value="/usr/bin/git"),
-            patch("aftr.refs.get_remote_commit", return_value="deadbeef"),
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch("aftr.refs.get_remote_commits", return_value={"main": "deadbeef"}),
+        ):
+            result = sync_source(project_dir, source)
+        assert result.status == "up_to_date"
+        assert result.commit == "deadbeef"
+
+    def test_sync_recent_state_skips_remote(self, project_dir: Path) -> None:
+        source = self._make_source()
+        save_refs_state(
+            project_dir,
+            {
+                "sources": {
+                    "guides": {
+                        "last_commit": "deadbeef",
+                        "synced_at": datetime.now(UTC).isoformat(),
+                    }
+                }
+            },
+        )
+        with (
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch("aftr.refs.get_remote_commits") as mock_remote,
         ):
             result = sync_source(project_dir, source)
         assert result.status == "up_to_date"
         assert result.commit == "deadbeef"
+        mock_remote.assert_not_called()
 
-    def test_sync_force_bypasses_up_to_date(
-        self, project_dir: Path, tmp_path: Path
+    def test_sync_zero_ttl_checks_remote(
+        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
     ) -> None:
+        monkeypatch.setenv("AFTR_REFS_TTL", "0")
+        source = self._make_source()
+        save_refs_state(
+            project_dir,
+            {
+                "sources": {
+                    "guides": {
+                        "last_commit": "deadbeef",
+                        "synced_at": datetime.now(UTC).isoformat(),
+                    }
+                }
+            },
+        )
+        with (
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch(
+                "aftr.refs.get_remote_commits", return_value={"main": "deadbeef"}
+            ) as remote,
+        ):
+            result = sync_source(project_dir, source)
+        assert result.status == "up_to_date"
+        remote.assert_called_once()
+
+    def test_sync_cache_first_ignores_age(self, project_dir: Path) -> None:
         source = self._make_source()
         save_refs_state(
             project_dir,
@@ -239,80 +501,164 @@ class TestSyncSource:
                 }
             },
         )
-        fake_tmpdir = tmp_path / "fake_clone"
-        fake_tmpdir.mkdir()
-        (fake_tmpdir / "guides").mkdir()
-        (fake_tmpdir / "guides" / "file.md").write_text("# Guide")
+        with (
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch("aftr.refs.get_remote_commits") as mock_remote,
+        ):
+            result = sync_source(project_dir, source, cache_first=True)
+        assert result.status == "up_to_date"
+        mock_remote.assert_not_called()
 
-        ls_remote = MagicMock(returncode=0, stdout="deadbeef\trefs/heads/main\n")
-        clone_ok = MagicMock(returncode=0, stderr="")
-        sparse_ok = MagicMock(returncode=0, stderr="")
+    def test_sync_force_bypasses_up_to_date(self, project_dir: Path) -> None:
+        source = self._make_source()
+        save_refs_state(
+            project_dir,
+            {
+                "sources": {
+                    "guides": {"last_commit": "deadbeef", "synced_at": "2024-01-01"}
+                }
+            },
+        )
 
         with (
-            patch("aftr.refs.shutil.which", return_value="/usr/bin/git"),
-            patch("aftr.refs.tempfile.mkdtemp", return_value=str(fake_tmpdir)),
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
             patch(
-                "aftr.refs.subprocess.run", side_effect=[ls_remote, clone_ok, sparse_ok]
+                "aftr.refs.subprocess.run",
+                side_effect=[_ok(), _fetched(source, "deadbeef")],
+            ),
+            patch(
+                "aftr.refs.subprocess.Popen",
+                return_value=_archive({"guides/file.md": "# Guide"}),
             ),
         ):
             result = sync_source(project_dir, source, force=True)
         assert result.status == "updated"
 
-    def test_sync_updated(self, project_dir: Path, tmp_path: Path) -> None:
+    def test_sync_updated(self, project_dir: Path) -> None:
         source = self._make_source()
-        # No prior state — remote SHA differs from nothing
-        fake_tmpdir = tmp_path / "fake_clone"
-        fake_tmpdir.mkdir()
-        guides_dir = fake_tmpdir / "guides"
-        guides_dir.mkdir()
-        (guides_dir / "python.md").write_text("# Python Guide")
-        (guides_dir / "sql.md").write_text("# SQL Guide")
-
-        ls_remote = MagicMock(returncode=0, stdout="newsha123\trefs/heads/main\n")
-        clone_ok = MagicMock(returncode=0, stderr="")
-        sparse_ok = MagicMock(returncode=0, stderr="")
+        # No prior state, so no ls-remote: the commit comes from the fetch
 
         with (
-            patch("aftr.refs.shutil.which", return_value="/usr/bin/git"),
-            patch("aftr.refs.tempfile.mkdtemp", return_value=str(fake_tmpdir)),
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch("aftr.refs.get_remote_commits") as mock_remote,
+            patch(
+                "aftr.refs.subprocess.run",
+                side_effect=[_ok(), _fetched(source, "newsha123")],
+            ),
             patch(
-                "aftr.refs.subprocess.run", side_effect=[ls_remote, clone_ok, sparse_ok]
+                "aftr.refs.subprocess.Popen",
+                return_value=_archive(
+                    {"guides/python.md": "# Python Guide", "guides/sql.md": "# SQL"}
+                ),
             ),
         ):
             result = sync_source(project_dir, source)
 
         assert result.status == "updated"
         assert result.commit == "newsha123"
+        mock_remote.assert_not_called()
         assert (project_dir / ".aftr" / "guides" / "python.md").exists()
         assert (project_dir / ".aftr" / "guides" / "sql.md").exists()
         # State updated
         state = load_refs_state(project_dir)
         assert state["sources"]["guides"]["last_commit"] == "newsha123"
 
-    def test_sync_overwrites_existing_files(
-        self, project_dir: Path, tmp_path: Path
-    ) -> None:
+    def test_sync_pinned_commit_skips_lookup(self, project_dir: Path) -> None:
+        sha = "a" * 40
+        source = self._make_source(branch=sha)
+
+        with (
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch("aftr.refs.get_remote_commits") as mock_remote,
+            patch("aftr.refs.subprocess.run", side_effect=[_ok(), _ok()]) as mock_run,
+            patch(
+                "aftr.refs.subprocess.Popen",
+                return_value=_archive({"guides/a.md": "# A"}),
+            ),
+        ):
+            result = sync_source(project_dir, source)
+
+        assert result.status == "updated"
+        assert result.commit == sha
+        mock_remote.assert_not_called()
+        assert mock_run.call_args_list[1][0][0][-1] == sha
+
+    def test_sync_pinned_commit_already_synced(self, project_dir: Path) -> None:
+        sha = "a" * 40
+        source = self._make_source(branch=sha)
+        save_refs_state(
+            project_dir,
+            {"sources": {"guides": {"last_commit": sha, "synced_at": "2024-01-01"}}},
+        )
+
+        with (
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch("aftr.refs.subprocess.run") as mock_run,
+        ):
+            result = sync_source(project_dir, source)
+
+        assert result.status == "up_to_date"
+        assert result.commit == sha
+        mock_run.assert_not_called()
+
+    def test_sync_pinned_commit_reuses_cached_fetch(self, project_dir: Path) -> None:
+        sha = "a" * 40
+        source = self._make_source(branch=sha)
+        cache = _cache_repo_path(source.url)
+        cache.mkdir(parents=True)
+        (cache / "HEAD").write_text("ref: refs/heads/main\n")
+        _fetched(source, sha)
+
+        with (
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch("aftr.refs.subprocess.run") as mock_run,
+            patch(
+                "aftr.refs.subprocess.Popen",
+                return_value=_archive({"guides/a.md": "# A"}),
+            ),
+        ):
+            result = sync_source(project_dir, source, force=True)
+
+        assert result.status == "updated"
+        mock_run.assert_not_called()
+
+    def test_sync_reuses_cache_repo(self, project_dir: Path, cache_dir: Path) -> None:
+        source = self._make_source()
+        (_cache_repo_path(source.url) / "HEAD").parent.mkdir(parents=True)
+        (_cache_repo_path(source.url) / "HEAD").write_text("ref: refs/heads/main\n")
+
+        with (
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch(
+                "aftr.refs.subprocess.run", side_effect=[_fetched(source, "sha2")]
+            ) as mock_run,
+            patch(
+                "aftr.refs.subprocess.Popen",
+                return_value=_archive({"guides/a.md": "# A"}),
+            ),
+        ):
+            result = sync_source(project_dir, source)
+
+        assert result.status == "updated"
+        assert mock_run.call_args_list[0][0][0][3] == "fetch"
+        assert _cache_repo_path(source.url).parent == cache_dir / "refs"
+
+    def test_sync_overwrites_existing_files(self, project_dir: Path) -> None:
         source = self._make_source()
         # Pre-create old destination
         old_dest = project_dir / ".aftr" / "guides"
         old_dest.mkdir(parents=True)
         (old_dest / "old_file.md").write_text("old content")
 
-        fake_tmpdir = tmp_path / "fake_clone2"
-        fake_tmpdir.mkdir()
-        guides_dir = fake_tmpdir / "guides"
-        guides_dir.mkdir()
-        (guides_dir / "new_file.md").write_text("# New")
-
-        ls_remote = MagicMock(returncode=0, stdout="sha999\trefs/heads/main\n")
-        clone_ok = MagicMock(returncode=0, stderr="")
-        sparse_ok = MagicMock(returncode=0, stderr="")
-
         with (
-            patch("aftr.refs.shutil.which", return_value="/usr/bin/git"),
-            patch("aftr.refs.tempfile.mkdtemp", return_value=str(fake_tmpdir)),
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
             patch(
-                "aftr.refs.subprocess.run", side_effect=[ls_remote, clone_ok, sparse_ok]
+                "aftr.refs.subprocess.run",
+                side_effect=[_ok(), _fetched(source, "sha999")],
+            ),
+            patch(
+                "aftr.refs.subprocess.Popen",
+                return_value=_archive({"guides/new_file.md": "# New"}),
             ),
         ):
             result = sync_source(project_dir, source)
@@ -320,79 +666,390 @@ class TestSyncSource:
         assert result.status == "updated"
         assert not (project_dir / ".aftr" / "guides" / "old_file.md").exists()
         assert (project_dir / ".aftr" / "guides" / "new_file.md").exists()
+        assert sorted(p.name for p in (project_dir / ".aftr").iterdir()) == [
+            ".state.json",
+            "guides",
+        ]
+
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX permission bits")
+    def test_sync_dest_follows_umask(self, project_dir: Path) -> None:
+        source = self._make_source()
+        old_umask = os.umask(0o022)
+        try:
+            with (
+                patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+                patch(
+                    "aftr.refs.subprocess.run",
+                    side_effect=[_ok(), _fetched(source, "sha999")],
+                ),
+                patch(
+                    "aftr.refs.subprocess.Popen",
+                    return_value=_archive({"guides/a.md": "# A"}),
+                ),
+            ):
+                result = sync_source(project_dir, source)
+        finally:
+            os.umask(old_umask)
+
+        assert result.status == "updated"
+        assert stat.S_IMODE((project_dir / ".aftr" / "guides").stat().st_mode) == 0o755
+
+    def test_sync_failed_swap_keeps_previous_files(self, project_dir: Path) -> None:
+        source = self._make_source()
+        old_dest = project_dir / ".aftr" / "guides"
+        old_dest.mkdir(parents=True)
+        (old_dest / "old_file.md").write_text("old content")
+        real_replace = os.replace
+        calls = []
+
+        def flaky_replace(src, dst) -> None:
+            calls.append((src, dst))
+            if len(calls) == 2:
+                raise PermissionError("file in use")
+            real_replace(src, dst)
+
+        with (
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch(
+                "aftr.refs.subprocess.run",
+                side_effect=[_ok(), _fetched(source, "sha999")],
+            ),
+            patch(
+                "aftr.refs.subprocess.Popen",
+                return_value=_archive({"guides/new_file.md": "# New"}),
+            ),
+            patch("aftr.refs.os.replace", side_effect=flaky_replace),
+        ):
+            result = sync_source(project_dir, source)
+
+        assert result.status == "error"
+        assert "file in use" in result.message
+        assert [p.name for p in old_dest.iterdir()] == ["old_file.md"]
+        assert [p.name for p in (project_dir / ".aftr").iterdir()] == ["guides"]
 
     def test_sync_git_not_available(self, project_dir: Path) -> None:
         source = self._make_source()
-        with patch("aftr.refs.shutil.which", return_value=None):
+        with patch("aftr.refs._git_path", return_value=None):
             result = sync_source(project_dir, source)
         assert result.status == "error"
         assert "PATH" in result.message or "git" in result.message.lower()
 
     def test_sync_ls_remote_fails(self, project_dir: Path) -> None:
         source = self._make_source()
-        ls_remote_fail = MagicMock(returncode=1, stdout="", stderr="fatal: not a repo")
+        save_refs_state(
+            project_dir,
+            {"sources": {"guides": {"last_commit": "old", "synced_at": "2024-01-01"}}},
+        )
+        ls_remote_fail = _result(returncode=1, stdout="", stderr="fatal: not a repo")
         with (
-            patch("aftr.refs.shutil.which", return_value="/usr/bin/git"),
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
             patch("aftr.refs.subprocess.run", return_value=ls_remote_fail),
         ):
             result = sync_source(project_dir, source)
         assert result.status == "error"
 
-    def test_sync_clone_fails(self, project_dir: Path) -> None:
+    def test_sync_fetch_fails(self, project_dir: Path) -> None:
         source = self._make_source()
-        ls_remote = MagicMock(returncode=0, stdout="sha1\trefs/heads/main\n")
-        clone_fail = MagicMock(returncode=128, stderr="fatal: clone error")
+        fetch_fail = _result(returncode=128, stderr="fatal: fetch error")
 
         with (
-            patch("aftr.refs.shutil.which", return_value="/usr/bin/git"),
-            patch("aftr.refs.subprocess.run", side_effect=[ls_remote, clone_fail]),
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch("aftr.refs.subprocess.run", side_effect=[_ok(), fetch_fail]),
         ):
             result = sync_source(project_dir, source)
         assert result.status == "error"
-        assert "clone" in result.message.lower() or "fatal" in result.message.lower()
+        assert "fetch" in result.message.lower()
 
-    def test_sync_path_not_in_repo(self, project_dir: Path, tmp_path: Path) -> None:
-        source = self._make_source(path="nonexistent/path")
-        fake_tmpdir = tmp_path / "empty_clone"
-        fake_tmpdir.mkdir()
-        # No 'nonexistent/path' directory created
+    def test_sync_unresolved_fetch_head(self, project_dir: Path) -> None:
+        source = self._make_source()
+
+        # The fetch "succeeds" but leaves no FETCH_HEAD behind
+        with (
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch("aftr.refs.subprocess.run", side_effect=[_ok(), _ok()]),
+            patch("aftr.refs.subprocess.Popen") as mock_popen,
+        ):
+            result = sync_source(project_dir, source)
+        assert result.status == "error"
+        assert "fetched commit" in result.message
+        mock_popen.assert_not_called()
 
-        ls_remote = MagicMock(returncode=0, stdout="sha1\trefs/heads/main\n")
-        clone_ok = MagicMock(returncode=0, stderr="")
-        sparse_ok = MagicMock(returncode=0, stderr="")
+    def test_sync_path_not_in_repo(self, project_dir: Path) -> None:
+        source = self._make_source(path="nonexistent/path")
 
         with (
-            patch("aftr.refs.shutil.which", return_value="/usr/bin/git"),
-            patch("aftr.refs.tempfile.mkdtemp", return_value=str(fake_tmpdir)),
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch(
+                "aftr.refs.subprocess.run",
+                side_effect=[_ok(), _fetched(source, "sha1")],
+            ),
             patch(
-                "aftr.refs.subprocess.run", side_effect=[ls_remote, clone_ok, sparse_ok]
+                "aftr.refs.subprocess.Popen",
+                return_value=_archive(
+                    None,
+                    returncode=128,
+                    stderr="fatal: pathspec 'nonexistent/path' did not match any files",
+                ),
             ),
         ):
             result = sync_source(project_dir, source)
         assert result.status == "error"
         assert "not found" in result.message.lower() or "nonexistent" in result.message
+        assert not (project_dir / ".aftr" / "guides").exists()
+
+    def _sync_archive(
+        self, project_dir: Path, source: RefsSource, proc: MagicMock
+    ) -> tuple[SyncResult, MagicMock]:
+        with (
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch(
+                "aftr.refs.subprocess.run",
+                side_effect=[_ok(), _fetched(source, "sha1")],
+            ),
+            patch("aftr.refs.subprocess.Popen", return_value=proc) as mock_popen,
+        ):
+            return sync_source(project_dir, source), mock_popen
+
+    @pytest.mark.parametrize("path", [".", ""])
+    def test_sync_whole_repo(self, project_dir: Path, path: str) -> None:
+        source = self._make_source(path=path)
+
+        result, mock_popen = self._sync_archive(
+            project_dir, source, _archive({"README.md": "# R", "docs/a.md": "# A"})
+        )
+
+        assert result.status == "updated"
+        assert mock_popen.call_args[0][0][-1] == "FETCH_HEAD"
+        dest = project_dir / ".aftr" / "guides"
+        assert (dest / "README.md").read_text() == "# R"
+        assert (dest / "docs" / "a.md").read_text() == "# A"
+
+    def test_sync_copies_symlink_targets(self, project_dir: Path) -> None:
+        source = self._make_source()
+
+        result, _ = self._sync_archive(
+            project_dir,
+            source,
+            _archive(
+                {"guides/a.md": "# A", "guides/sub/b.md": "# B"},
+                links={
+                    "guides/alias.md": "a.md",
+                    "guides/alias-dir": "sub",
+                    "guides/chain.md": "alias.md",
+                },
+            ),
+        )
+
+        assert result.status == "updated"
+        dest = project_dir / ".aftr" / "guides"
+        assert not (dest / "alias.md").is_symlink()
+        assert (dest / "alias.md").read_text() == "# A"
+        assert (dest / "chain.md").read_text() == "# A"
+        assert (dest / "alias-dir" / "b.md").read_text() == "# B"
 
-    def test_sync_cleanup_on_error(self, project_dir: Path, tmp_path: Path) -> None:
+    def test_sync_rejects_symlink_outside_path(self, project_dir: Path) -> None:
+        source = self._make_source()
+
+        result, _ = self._sync_archive(
+            project_dir,
+            source,
+            _archive({"guides/a.md": "# A"}, links={"guides/x": "../../etc/passwd"}),
+        )
+
+        assert result.status == "error"
+        assert "outside" in result.message
+        assert not (project_dir / ".aftr" / "guides").exists()
+
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX permission bits")
+    def test_sync_keeps_exec_bits(self, project_dir: Path) -> None:
+        source = self._make_source()
+        old_umask = os.umask(0o022)
+        try:
+            result, _ = self._sync_archive(
+                project_dir,
+                source,
+                _archive(
+                    {"guides/run.sh": "#!/bin/sh\n", "guides/a.md": "# A"},
+                    executable=("guides/run.sh",),
+                ),
+            )
+        finally:
+            os.umask(old_umask)
+
+        assert result.status == "updated"
+        dest = project_dir / ".aftr" / "guides"
+        assert stat.S_IMODE((dest / "run.sh").stat().st_mode) == 0o755
+        assert stat.S_IMODE((dest / "a.md").stat().st_mode) == 0o644
+
+    def test_sync_archive_failure_is_not_path_not_found(
+        self, project_dir: Path
+    ) -> None:
         source = self._make_source()
-        fake_tmpdir = tmp_path / "timeout_clone"
-        fake_tmpdir.mkdir()
 
-        ls_remote = MagicMock(returncode=0, stdout="sha1\trefs/heads/main\n")
+        result, _ = self._sync_archive(
+            project_dir,
+            source,
+            _archive(
+                {"guides/a.md": "# A"},
+                returncode=128,
+                stderr="fatal: unable to fetch missing blob",
+            ),
+        )
+
+        assert result.status == "error"
+        assert "git archive failed" in result.message
+        assert "missing blob" in result.message
+        assert not (project_dir / ".aftr" / "guides").exists()
+
+    def test_sync_cleanup_on_error(self, project_dir: Path) -> None:
+        source = self._make_source()
+        old_dest = project_dir / ".aftr" / "guides"
+        old_dest.mkdir(parents=True)
+        (old_dest / "old_file.md").write_text("old content")
+        archive = _archive({"guides/partial.md": "# Partial"})
+        archive.wait.side_effect = TimeoutExpired("git", 120)
 
         with (
-            patch("aftr.refs.shutil.which", return_value="/usr/bin/git"),
-            patch("aftr.refs.tempfile.mkdtemp", return_value=str(fake_tmpdir)),
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
             patch(
                 "aftr.refs.subprocess.run",
-                side_effect=[ls_remote, TimeoutExpired("git", 120)],
+                side_effect=[_ok(), _fetched(source, "sha1")],
             ),
+            patch("aftr.refs.subprocess.Popen", return_value=archive),
         ):
             result = sync_source(project_dir, source)
 
         assert result.status == "error"
         assert "timed out" in result.message.lower()
-        # Temp dir should be cleaned up by finally block
-        assert not fake_tmpdir.exists()
+        archive.kill.assert_called_once()
+        # Staging dir is removed and the previous sync is left in place
+        assert [p.name for p in (project_dir / ".aftr").iterdir()] == ["guides"]
+        assert [p.name for p in old_dest.iterdir()] == ["old_file.md"]
+
+
+class TestSyncAll:
+    def test_sync_all_empty(self, project_dir: Path) -> None:
+        assert sync_all(project_dir, []) == []
+
+    def test_sync_all_preserves_source_order(self, project_dir: Path) -> None:
+        sources = [
+            RefsSource(name=n, url=f"https://example.com/{n}", path="docs")
+            for n in ("c", "a", "b")
+        ]
+        save_refs_state(
+            project_dir,
+            {"sources": {n: {"last_commit": "sha"} for n in ("a", "b", "c")}},
+        )
+        with (
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch("aftr.refs.get_remote_commits", return_value={"main": "sha"}),
+            patch("aftr.refs.save_refs_state") as mock_save,
+        ):
+            results = sync_all(project_dir, sources)
+        assert [r.name for r in results] == ["c", "a", "b"]
+        assert all(r.status == "up_to_date" for r in results)
+        mock_save.assert_not_called()
+
+    def test_sync_all_one_ls_remote_per_url(self, project_dir: Path) -> None:
+        sources = [
+            RefsSource(name="a", url="https://example.com/x", path="a", branch="main"),
+            RefsSource(name="b", url="https://example.com/x", path="b", branch="dev"),
+            RefsSource(name="c", url="https://example.com/y", path="c", branch="main"),
+        ]
+        save_refs_state(
+            project_dir,
+            {"sources": {n: {"last_commit": "sha"} for n in ("a", "b", "c")}},
+        )
+        with (
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch(
+                "aftr.refs.get_remote_commits",
+                return_value={"main": "sha", "dev": "sha"},
+            ) as mock_remote,
+        ):
+            results = sync_all(project_dir, sources)
+        assert all(r.status == "up_to_date" for r in results)
+        calls = sorted(c.args for c in mock_remote.call_args_list)
+        assert calls == [
+            ("https://example.com/x", ["main", "dev"]),
+            ("https://example.com/y", ["main"]),
+        ]
+
+    def test_sync_all_ttl_expiring_mid_batch(self, project_dir: Path) -> None:
+        source = RefsSource(name="a", url="https://example.com/a", path="docs")
+        save_refs_state(
+            project_dir,
+            {"sources": {"a": {"last_commit": "sha", "synced_at": "2024-01-01"}}},
+        )
+        # Within the TTL when the batch is planned, expired by any later check
+        with (
+            patch("aftr.refs._git_path", return_value="/usr/bin/git"),
+            patch("aftr.refs._synced_within", side_effect=[True, False]),
+            patch("aftr.refs.get_remote_commits") as mock_remote,
+        ):
+            results = sync_all(project_dir, [source])
+        assert results[0].status == "up_to_date"
+        mock_remote.assert_not_called()
+
+    def test_sync_all_runs_sources_concurrently(self, project_dir: Path) -> None:
+        sources = [
+            RefsSource(name=n, url=f"https://example.com/{n}", path="docs")
+            for n in ("a", "b", "c")
+        ]
+        # Every sync waits until all three are in flight; a serial loop would
+        # break the barrier on timeout.
+        barrier = threading.Barrier(len(sources), timeout=5)
+
+        def fake_sync_one(project_dir, source, *args):
+            barrier.wait()
+            return SyncResult(name=source.name, status="updated", message="ok"), None
+
+        with (
+            patch("aftr.refs._git_path", return_value=None),
+            patch("aftr.refs._sync_one", side_effect=fake_sync_one),
+        ):
+            results = sync_all(project_dir, sources)
+        assert [r.status for r in results] == ["updated"] * 3
+
+
+class TestPruneRefsCache:
+    def _repo(self, cache_dir: Path, name: str, size: int, fetched: int) -> Path:
+        repo = cache_dir / "refs" / f"{name}.git"
+        repo.mkdir(parents=True)
+        (repo / "pack").write_bytes(b"x" * size)
+        (repo / "FETCH_HEAD").write_text("sha\n")
+        os.utime(repo / "FETCH_HEAD", (fetched, fetched))
+        return repo
+
+    def test_evicts_least_recently_fetched(
+        self, cache_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setenv("AFTR_REFS_CACHE_MAX_BYTES", "250")
+        old = self._repo(cache_dir, "old", 100, fetched=1_000)
+        mid = self._repo(cache_dir, "mid", 100, fetched=2_000)
+        new = self._repo(cache_dir, "new", 100, fetched=3_000)
+
+        _prune_refs_cache()
+
+        assert not old.exists()
+        assert mid.exists()
+        assert new.exists()
+
+    def test_keeps_repos_in_use(
+        self, cache_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setenv("AFTR_REFS_CACHE_MAX_BYTES", "150")
+        old = self._repo(cache_dir, "old", 100, fetched=1_000)
+        new = self._repo(cache_dir, "new", 100, fetched=2_000)
+
+        _prune_refs_cache(keep={old})
+
+        assert old.exists()
+        assert not new.exists()
+
+    def test_missing_cache_dir(self, cache_dir: Path) -> None:
+        _prune_refs_cache()
+        assert not (cache_dir / "refs").exists()
 
 
 # ---------------------------------------------------------------------------
@@ -401,17 +1058,12 @@ class TestSyncSource:
 
 
 class TestRefsList:
-    def test_list_no_sources(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
-        monkeypatch.chdir(project_dir)
-        result = runner.invoke(refs_app, ["list"])
+    def test_list_no_sources(self, project_dir: Path) -> None:
+        result = runner.invoke(refs_app, ["--project-root", str(project_dir), "list"])
         assert result.exit_code == 0
         assert "No sources" in result.stdout
 
-    def test_list_with_sources(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
+    def test_list_with_sources(self, project_dir: Path) -> None:
         save_refs_config(
             project_dir,
             [
@@ -423,15 +1075,12 @@ class TestRefsList:
                 ),
             ],
         )
-        monkeypatch.chdir(project_dir)
-        result = runner.invoke(refs_app, ["list"])
+        result = runner.invoke(refs_app, ["--project-root", str(project_dir), "list"])
         assert result.exit_code == 0
         assert "alpha" in result.stdout
         assert "beta" in result.stdout
 
-    def test_list_shows_last_synced(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
+    def test_list_shows_last_synced(self, project_dir: Path) -> None:
         save_refs_config(
             project_dir,
             [
@@ -451,20 +1100,41 @@ class TestRefsList:
                 }
             },
         )
-        monkeypatch.chdir(project_dir)
-        result = runner.invoke(refs_app, ["list"])
+        result = runner.invoke(refs_app, ["--project-root", str(project_dir), "list"])
         assert result.exit_code == 0
         assert "2024-06-01" in result.stdout
 
-
-class TestRefsAdd:
-    def test_add_creates_refs_toml(
+    def test_list_defaults_to_cwd(
         self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
     ) -> None:
+        save_refs_config(project_dir, [RefsSource(name="alpha", url="u", path="p")])
         monkeypatch.chdir(project_dir)
+        result = runner.invoke(refs_app, ["list"])
+        assert result.exit_code == 0
+        assert "alpha" in result.stdout
+
+    def test_project_root_does_not_leak_between_invocations(
+        self, project_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        save_refs_config(project_dir, [RefsSource(name="alpha", url="u", path="p")])
+        other = tmp_path / "other"
+        other.mkdir()
+        monkeypatch.chdir(other)
+
+        first = runner.invoke(refs_app, ["--project-root", str(project_dir), "list"])
+        second = runner.invoke(refs_app, ["list"])
+
+        assert "alpha" in first.stdout
+        assert "No sources" in second.stdout
+
+
+class TestRefsAdd:
+    def test_add_creates_refs_toml(self, project_dir: Path) -> None:
         result = runner.invoke(
             refs_app,
             [
+                "--project-root",
+                str(project_dir),
                 "add",
                 "--url",
                 "https://example.com/repo",
@@ -483,13 +1153,12 @@ class TestRefsAdd:
         assert sources[0].name == "docs"
         assert sources[0].url == "https://example.com/repo"
 
-    def test_add_updates_gitignore(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
-        monkeypatch.chdir(project_dir)
+    def test_add_updates_gitignore(self, project_dir: Path) -> None:
         runner.invoke(
             refs_app,
             [
+                "--project-root",
+                str(project_dir),
                 "add",
                 "--url",
                 "https://example.com/repo",
@@ -505,13 +1174,12 @@ class TestRefsAdd:
         assert gitignore.exists()
         assert GITIGNORE_ENTRY in gitignore.read_text()
 
-    def test_add_defaults_local_dir_to_name(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
-        monkeypatch.chdir(project_dir)
+    def test_add_defaults_local_dir_to_name(self, project_dir: Path) -> None:
         runner.invoke(
             refs_app,
             [
+                "--project-root",
+                str(project_dir),
                 "add",
                 "--url",
                 "https://example.com/repo",
@@ -526,13 +1194,12 @@ class TestRefsAdd:
         sources = load_refs_config(project_dir)
         assert sources[0].local_dir == "myrefs"
 
-    def test_add_custom_local_dir(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
-        monkeypatch.chdir(project_dir)
+    def test_add_custom_local_dir(self, project_dir: Path) -> None:
         runner.invoke(
             refs_app,
             [
+                "--project-root",
+                str(project_dir),
                 "add",
                 "--url",
                 "https://example.com/repo",
@@ -549,9 +1216,7 @@ class TestRefsAdd:
         sources = load_refs_config(project_dir)
         assert sources[0].local_dir == "custom_dir"
 
-    def test_add_duplicate_name_errors(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
+    def test_add_duplicate_name_errors(self, project_dir: Path) -> None:
         save_refs_config(
             project_dir,
             [
@@ -563,10 +1228,11 @@ class TestRefsAdd:
                 )
             ],
         )
-        monkeypatch.chdir(project_dir)
         result = runner.invoke(
             refs_app,
             [
+                "--project-root",
+                str(project_dir),
                 "add",
                 "--url",
                 "https://other.com/repo",
@@ -581,13 +1247,12 @@ class TestRefsAdd:
         assert result.exit_code == 1
         assert "docs" in result.stdout
 
-    def test_add_second_source_appends(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
-        monkeypatch.chdir(project_dir)
+    def test_add_second_source_appends(self, project_dir: Path) -> None:
         runner.invoke(
             refs_app,
             [
+                "--project-root",
+                str(project_dir),
                 "add",
                 "--url",
                 "https://a.com/repo",
@@ -602,6 +1267,8 @@ class TestRefsAdd:
         runner.invoke(
             refs_app,
             [
+                "--project-root",
+                str(project_dir),
                 "add",
                 "--url",
                 "https://b.com/repo",
@@ -639,17 +1306,12 @@ class TestRefsSync:
     def _mock_sync_error(self, name: str) -> SyncResult:
         return SyncResult(name=name, status="error", message="Connection failed.")
 
-    def test_sync_no_sources(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
-        monkeypatch.chdir(project_dir)
-        result = runner.invoke(refs_app, ["sync"])
+    def test_sync_no_sources(self, project_dir: Path) -> None:
+        result = runner.invoke(refs_app, ["--project-root", str(project_dir), "sync"])
         assert result.exit_code == 0
         assert "No sources" in result.stdout
 
-    def test_sync_unknown_name(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
+    def test_sync_unknown_name(self, project_dir: Path) -> None:
         save_refs_config(
             project_dir,
             [
@@ -658,13 +1320,12 @@ class TestRefsSync:
                 )
             ],
         )
-        monkeypatch.chdir(project_dir)
-        result = runner.invoke(refs_app, ["sync", "b"])
+        result = runner.invoke(
+            refs_app, ["--project-root", str(project_dir), "sync", "b"]
+        )
         assert result.exit_code == 1
 
-    def test_sync_all_up_to_date(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
+    def test_sync_all_up_to_date(self, project_dir: Path) -> None:
         save_refs_config(
             project_dir,
             [
@@ -682,21 +1343,20 @@ class TestRefsSync:
                 ),
             ],
         )
-        monkeypatch.chdir(project_dir)
         with patch(
-            "aftr.refs.sync_source",
-            side_effect=[
+            "aftr.refs.sync_all",
+            return_value=[
                 self._mock_sync_up_to_date("a"),
                 self._mock_sync_up_to_date("b"),
             ],
         ):
-            result = runner.invoke(refs_app, ["sync"])
+            result = runner.invoke(
+                refs_app, ["--project-root", str(project_dir), "sync"]
+            )
         assert result.exit_code == 0
         assert "Already up to date" in result.stdout
 
-    def test_sync_all_one_updated(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
+    def test_sync_all_one_updated(self, project_dir: Path) -> None:
         save_refs_config(
             project_dir,
             [
@@ -714,21 +1374,20 @@ class TestRefsSync:
                 ),
             ],
         )
-        monkeypatch.chdir(project_dir)
         with patch(
-            "aftr.refs.sync_source",
-            side_effect=[
+            "aftr.refs.sync_all",
+            return_value=[
                 self._mock_sync_up_to_date("a"),
                 self._mock_sync_updated("b"),
             ],
         ):
-            result = runner.invoke(refs_app, ["sync"])
+            result = runner.invoke(
+                refs_app, ["--project-root", str(project_dir), "sync"]
+            )
         assert result.exit_code == 0
         assert "Updated" in result.stdout
 
-    def test_sync_named_source(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
+    def test_sync_named_source(self, project_dir: Path) -> None:
         save_refs_config(
             project_dir,
             [
@@ -746,17 +1405,16 @@ class TestRefsSync:
                 ),
             ],
         )
-        monkeypatch.chdir(project_dir)
-        with patch("aftr.refs.sync_source") as mock_sync:
-            mock_sync.return_value = self._mock_sync_up_to_date("a")
-            result = runner.invoke(refs_app, ["sync", "a"])
+        with patch("aftr.refs.sync_all") as mock_sync:
+            mock_sync.return_value = [self._mock_sync_up_to_date("a")]
+            result = runner.invoke(
+                refs_app, ["--project-root", str(project_dir), "sync", "a"]
+            )
         assert result.exit_code == 0
         assert mock_sync.call_count == 1
-        assert mock_sync.call_args[0][1].name == "a"
+        assert [s.name for s in mock_sync.call_args[0][1]] == ["a"]
 
-    def test_sync_error_exits_nonzero(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
+    def test_sync_error_exits_nonzero(self, project_dir: Path) -> None:
         save_refs_config(
             project_dir,
             [
@@ -765,15 +1423,15 @@ class TestRefsSync:
                 )
             ],
         )
-        monkeypatch.chdir(project_dir)
-        with patch("aftr.refs.sync_source", return_value=self._mock_sync_error("a")):
-            result = runner.invoke(refs_app, ["sync"])
+        with patch("aftr.refs.sync_all", return_value=[self._mock_sync_error("a")]):
+            result = runner.invoke(
+                refs_app, ["--project-root", str(project_dir), "sync"]
+            )
         assert result.exit_code == 1
         assert "Connection failed" in result.stdout
+        assert "Synced" not in result.stdout
 
-    def test_sync_force_flag(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
+    def test_sync_force_flag(self, project_dir: Path) -> None:
         save_refs_config(
             project_dir,
             [
@@ -782,26 +1440,24 @@ class TestRefsSync:
                 )
             ],
         )
-        monkeypatch.chdir(project_dir)
-        with patch("aftr.refs.sync_source") as mock_sync:
-            mock_sync.return_value = self._mock_sync_updated("a")
-            result = runner.invoke(refs_app, ["sync", "--force"])
+        with patch("aftr.refs.sync_all") as mock_sync:
+            mock_sync.return_value = [self._mock_sync_updated("a")]
+            result = runner.invoke(
+                refs_app, ["--project-root", str(project_dir), "sync", "--force"]
+            )
         assert result.exit_code == 0
         _, kwargs = mock_sync.call_args
         assert kwargs.get("force") is True
 
 
 class TestRefsRemove:
-    def test_remove_unknown_name(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
-        monkeypatch.chdir(project_dir)
-        result = runner.invoke(refs_app, ["remove", "nonexistent"])
+    def test_remove_unknown_name(self, project_dir: Path) -> None:
+        result = runner.invoke(
+            refs_app, ["--project-root", str(project_dir), "remove", "nonexistent"]
+        )
         assert result.exit_code == 1
 
-    def test_remove_confirmed(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
+    def test_remove_confirmed(self, project_dir: Path) -> None:
         save_refs_config(
             project_dir,
             [
@@ -813,15 +1469,16 @@ class TestRefsRemove:
                 )
             ],
         )
-        monkeypatch.chdir(project_dir)
-        result = runner.invoke(refs_app, ["remove", "docs"], input="y\n")
+        result = runner.invoke(
+            refs_app,
+            ["--project-root", str(project_dir), "remove", "docs"],
+            input="y\n",
+        )
         assert result.exit_code == 0
         sources = load_refs_config(project_dir)
         assert not any(s.name == "docs" for s in sources)
 
-    def test_remove_aborted(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
+    def test_remove_aborted(self, project_dir: Path) -> None:
         save_refs_config(
             project_dir,
             [
@@ -833,15 +1490,16 @@ class TestRefsRemove:
                 )
             ],
         )
-        monkeypatch.chdir(project_dir)
-        result = runner.invoke(refs_app, ["remove", "docs"], input="n\n")
+        result = runner.invoke(
+            refs_app,
+            ["--project-root", str(project_dir), "remove", "docs"],
+            input="n\n",
+        )
         assert result.exit_code == 0
         sources = load_refs_config(project_dir)
         assert any(s.name == "docs" for s in sources)
 
-    def test_remove_cleans_state(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
+    def test_remove_cleans_state(self, project_dir: Path) -> None:
         save_refs_config(
             project_dir,
             [
@@ -857,14 +1515,15 @@ class TestRefsRemove:
             project_dir,
             {"sources": {"docs": {"last_commit": "abc", "synced_at": "2024-01-01"}}},
         )
-        monkeypatch.chdir(project_dir)
-        runner.invoke(refs_app, ["remove", "docs"], input="y\n")
+        runner.invoke(
+            refs_app,
+            ["--project-root", str(project_dir), "remove", "docs"],
+            input="y\n",
+        )
         state = load_refs_state(project_dir)
         assert "docs" not in state.get("sources", {})
 
-    def test_remove_delete_files(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
+    def test_remove_delete_files(self, project_dir: Path) -> None:
         save_refs_config(
             project_dir,
             [
@@ -879,16 +1538,15 @@ class TestRefsRemove:
         local_dir = project_dir / ".aftr" / "docs"
         local_dir.mkdir(parents=True)
         (local_dir / "file.md").write_text("# Doc")
-        monkeypatch.chdir(project_dir)
         result = runner.invoke(
-            refs_app, ["remove", "docs", "--delete-files"], input="y\n"
+            refs_app,
+            ["--project-root", str(project_dir), "remove", "docs", "--delete-files"],
+            input="y\n",
         )
         assert result.exit_code == 0
         assert not local_dir.exists()
 
-    def test_remove_delete_files_missing_dir(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
+    def test_remove_delete_files_missing_dir(self, project_dir: Path) -> None:
         save_refs_config(
             project_dir,
             [
@@ -900,9 +1558,10 @@ class TestRefsRemove:
                 )
             ],
         )
-        monkeypatch.chdir(project_dir)
         result = runner.invoke(
-            refs_app, ["remove", "docs", "--delete-files"], input="y\n"
+            refs_app,
+            ["--project-root", str(project_dir), "remove", "docs", "--delete-files"],
+            input="y\n",
         )
         assert result.exit_code == 0
 
@@ -912,58 +1571,87 @@ class TestRefsRemove:
 # ---------------------------------------------------------------------------
 
 
-@pytest.fixture
-def local_bare_repo(tmp_path: Path):
-    """A real local bare git repo seeded with markdown files.
-
-    Returns (remote_url, project_dir) where remote_url points to the bare repo.
-    """
-    remote = tmp_path / "remote"
-    work = tmp_path / "work"
-    project = tmp_path / "project"
-    project.mkdir()
-
-    # Init bare repo
-    subprocess.run(
-        ["git", "init", "--bare", str(remote)], check=True, capture_output=True
-    )
-    # Clone to work tree
-    subprocess.run(
-        ["git", "clone", str(remote), str(work)], check=True, capture_output=True
-    )
-
-    # Configure git identity for commits
-    subprocess.run(
-        ["git", "-C", str(work), "config", "user.email", "test@example.com"],
-        check=True,
-        capture_output=True,
-    )
+def _git(*args: str) -> None:
+    # Output is discarded; only stderr is kept, for CalledProcessError messages
     subprocess.run(
-        ["git", "-C", str(work), "config", "user.name", "Test User"],
+        ["git", *args],
         check=True,
-        capture_output=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
     )
 
-    # Seed files
-    guides = work / "guides"
-    guides.mkdir()
-    (guides / "python.md").write_text("# Python Guide\n\nContent here.")
-    (guides / "sql.md").write_text("# SQL Guide\n\nContent here.")
 
-    subprocess.run(
-        ["git", "-C", str(work), "add", "."], check=True, capture_output=True
+def _seed_bare_repo(root: Path) -> tuple[Path, Path]:
+    """Create a bare repo under root seeded with markdown files.
+
+    Returns (remote, work) where work is a clone used to push commits.
+    """
+    remote = root / "remote"
+    work = root / "work"
+    files = {
+        "guides/python.md": b"# Python Guide\n\nContent here.",
+        "guides/sql.md": b"# SQL Guide\n\nContent here.",
+    }
+
+    _git("init", "--bare", "--initial-branch=main", str(remote))
+
+    # Write the initial commit straight into the remote in one process
+    stream = bytearray()
+    for mark, content in enumerate(files.values(), 1):
+        stream += b"blob\nmark :%d\ndata %d\n%s\n" % (mark, len(content), content)
+    stream += (
+        b"commit refs/heads/main\n"
+        b"committer Test User <test@example.com> 0 +0000\n"
+        b"data 4\ninit\n"
     )
+    for mark, path in enumerate(files, 1):
+        stream += b"M 100644 :%d %s\n" % (mark, path.encode())
     subprocess.run(
-        ["git", "-C", str(work), "commit", "-m", "init"],
+        ["git", "-C", str(remote), "fast-import", "--quiet"],
+        input=bytes(stream),
         check=True,
-        capture_output=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
     )
-    subprocess.run(
-        ["git", "-C", str(work), "push", "origin", "HEAD:main"],
-        check=True,
-        capture_output=True,
+
+    # Clone with a git identity so tests can commit and push updates
+    _git(
+        "clone",
+        "-c",
+        "user.email=test@example.com",
+        "-c",
+        "user.name=Test User",
+        str(remote),
+        str(work),
     )
 
+    return remote, work
+
+
+@pytest.fixture(scope="session")
+def _seeded_remote(tmp_path_factory: pytest.TempPathFactory) -> tuple[Path, Path]:
+    """The seeded bare repo, built once per session. Tests must not push to it."""
+    return _seed_bare_repo(tmp_path_factory.mktemp("seeded_remote"))
+
+
+@pytest.fixture
+def local_bare_repo(_seeded_remote: tuple[Path, Path], tmp_path: Path):
+    """A real local bare git repo seeded with markdown files.
+
+    Returns (remote, work, project_dir). The remote is shared across the
+    session and read-only; only the project dir is per-test.
+    """
+    project = tmp_path / "project"
+    project.mkdir()
+    return (*_seeded_remote, project)
+
+
+@pytest.fixture
+def writable_bare_repo(tmp_path: Path):
+    """Like local_bare_repo, but with a private remote the test may push to."""
+    remote, work = _seed_bare_repo(tmp_path)
+    project = tmp_path / "project"
+    project.mkdir()
     return remote, work, project
 
 
@@ -1008,8 +1696,12 @@ class TestIntegration:
         second = sync_source(project, source)
         assert second.status == "up_to_date"
 
-    def test_integration_sync_after_remote_update(self, local_bare_repo) -> None:
-        remote, work, project = local_bare_repo
+    def test_integration_sync_after_remote_update(
+        self, writable_bare_repo, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        remote, work, project = writable_bare_repo
+        # Check the remote again straight away instead of trusting the last sync
+        monkeypatch.setenv("AFTR_REFS_TTL", "0")
         source = RefsSource(
             name="guides", url=str(remote), path="guides", branch="main"
         )
@@ -1019,34 +1711,81 @@ class TestIntegration:
 
         # Push a new commit to the remote
         (work / "guides" / "updated.md").write_text("# Updated")
-        subprocess.run(
-            ["git", "-C", str(work), "add", "."], check=True, capture_output=True
-        )
-        subprocess.run(
-            ["git", "-C", str(work), "commit", "-m", "update"],
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "-C", str(work), "push", "origin", "HEAD:main"],
-            check=True,
-            capture_output=True,
-        )
+        _git("-C", str(work), "add", ".")
+        _git("-C", str(work), "commit", "-m", "update")
+        _git("-C", str(work), "push", "origin", "HEAD:main")
 
         second = sync_source(project, source)
         assert second.status == "updated"
         assert second.commit != first.commit
         assert (project / ".aftr" / "guides" / "updated.md").exists()
 
-    def test_integration_gitignore_created(
+    def test_integration_sync_pinned_commit(self, local_bare_repo, tmp_path) -> None:
+        remote, work, project = local_bare_repo
+        source = RefsSource(
+            name="guides", url=str(remote), path="guides", branch="main"
+        )
+        first = sync_source(project, source)
+        assert first.status == "updated", first.message
+
+        # Another project pinned to that commit extracts it from the cache
+        other = tmp_path / "other"
+        other.mkdir()
+        pinned = RefsSource(
+            name="guides", url=str(remote), path="guides", branch=first.commit
+        )
+        with patch("aftr.refs.subprocess.run", wraps=subprocess.run) as run:
+            result = sync_source(other, pinned)
+
+        assert result.status == "updated", result.message
+        assert result.commit == first.commit
+        run.assert_not_called()
+        assert (other / ".aftr" / "guides" / "python.md").exists()
+
+    def test_integration_sync_all_writes_state_once(self, local_bare_repo) -> None:
+        remote, work, project = local_bare_repo
+        sources = [
+            RefsSource(name="one", url=str(remote), path="guides", branch="main"),
+            RefsSource(name="two", url=str(remote), path="guides", branch="main"),
+        ]
+
+        with patch("aftr.refs._write_refs_state", wraps=_write_refs_state) as save:
+            results = sync_all(project, sources)
+
+        assert [r.status for r in results] == ["updated", "updated"]
+        save.assert_called_once()
+        state = load_refs_state(project)
+        assert set(state["sources"]) == {"one", "two"}
+        assert (project / ".aftr" / "one" / "python.md").exists()
+        assert (project / ".aftr" / "two" / "python.md").exists()
+
+    def test_integration_pygit2_ls_remote(
         self, local_bare_repo, monkeypatch: pytest.MonkeyPatch
     ) -> None:
+        pygit2 = pytest.importorskip("pygit2")
+        monkeypatch.setattr("aftr.refs._pygit2", lambda: pygit2)
+        remote, work, project = local_bare_repo
+        expected = subprocess.run(
+            ["git", "-C", str(remote), "rev-parse", "main"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+
+        with patch("aftr.refs.subprocess.run") as mock_run:
+            heads = get_remote_commits(str(remote), ["main"])
+
+        assert heads == {"main": expected}
+        mock_run.assert_not_called()
+
+    def test_integration_gitignore_created(self, local_bare_repo) -> None:
         remote, work, project = local_bare_repo
-        monkeypatch.chdir(project)
 
         result = runner.invoke(
             refs_app,
             [
+                "--project-root",
+                str(project),
                 "add",
                 "--url",
                 str(remote),
@@ -1063,3 +1802,20 @@ class TestIntegration:
         gitignore = project / ".gitignore"
         assert gitignore.exists()
         assert GITIGNORE_ENTRY in gitignore.read_text()
+
+    def test_integration_cli_sync_all_sources(self, local_bare_repo) -> None:
+        remote, work, project = local_bare_repo
+        save_refs_config(
+            project,
+            [
+                RefsSource(name="one", url=str(remote), path="guides"),
+                RefsSource(name="two", url=str(remote), path="guides"),
+            ],
+        )
+
+        result = runner.invoke(refs_app, ["--project-root", str(project), "sync"])
+
+        assert result.exit_code == 0, result.output
+        assert (project / ".aftr" / "one" / "python.md").exists()
+        assert (project / ".aftr" / "two" / "python.md").exists()
+        assert set(load_refs_state(project)["sources"]) == {"one", "two"}
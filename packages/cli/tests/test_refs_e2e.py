@@ -9,6 +9,7 @@ and are skipped by default — run them explicitly:
 
 from __future__ import annotations
 
+import subprocess
 from pathlib import Path
 
 import pytest
@@ -49,6 +50,42 @@ KNOWN_DOC_FILES = [
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture(scope="session")
+def require_remote() -> None:
+    """Skip network tests up front when the remote can't be reached.
+
+    Probed once per session; pytest re-raises the cached skip for every
+    later test instead of letting each sync run into git's timeout.
+    """
+    try:
+        subprocess.run(
+            ["git", "ls-remote", "--exit-code", REMOTE_URL, "HEAD"],
+            check=True,
+            timeout=10,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError):
+        pytest.skip(f"{REMOTE_URL} is not reachable")
+
+
+@pytest.fixture(scope="session")
+def shared_cache_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """One refs cache for the whole run (per worker under xdist).
+
+    The first sync fetches from GitHub into it; later syncs only fetch the
+    delta, and the user's real cache is left alone.
+    """
+    return tmp_path_factory.mktemp("refs-cache")
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(shared_cache_dir: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr("aftr.config.get_cache_dir", lambda: shared_cache_dir)
+    return shared_cache_dir
+
+
 @pytest.fixture()
 def project_dir(tmp_path: Path) -> Path:
     """Clean temporary directory that acts as a user's project root."""
@@ -105,9 +142,10 @@ def project_with_source_synced(
 class TestE2ERefsAdd:
     """CLI `aftr refs add` with the real remote URL."""
 
-    def test_add_registers_source_in_config(
+    def test_add_registers_source_and_gitignore_entry(
         self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
     ) -> None:
+        # One add covers both: the config entry and the .gitignore line
         monkeypatch.chdir(project_dir)
         result = runner.invoke(
             refs_app,
@@ -134,24 +172,6 @@ class TestE2ERefsAdd:
         assert src.branch == REMOTE_BRANCH
         assert src.local_dir == SOURCE_NAME  # defaults to name
 
-    def test_add_creates_gitignore_entry(
-        self, project_dir: Path, monkeypatch: pytest.MonkeyPatch
-    ) -> None:
-        monkeypatch.chdir(project_dir)
-        runner.invoke(
-            refs_app,
-            [
-                "add",
-                "--url",
-                REMOTE_URL,
-                "--path",
-                REMOTE_PATH,
-                "--name",
-                SOURCE_NAME,
-                "--branch",
-                REMOTE_BRANCH,
-            ],
-        )
         gitignore = project_dir / ".gitignore"
         assert gitignore.exists()
         assert GITIGNORE_ENTRY in gitignore.read_text(encoding="utf-8")
@@ -181,6 +201,7 @@ class TestE2ERefsAdd:
 
 
 @pytest.mark.e2e
+@pytest.mark.usefixtures("require_remote")
 class TestE2ERefsSync:
     """Direct `sync_source` API against the real remote."""
 
@@ -264,6 +285,7 @@ class TestE2ERefsSync:
 
 
 @pytest.mark.e2e
+@pytest.mark.usefixtures("require_remote")
 class TestE2ERefsCLIRoundTrip:
     """Full CLI round-trips: add → sync → list → remove."""
 
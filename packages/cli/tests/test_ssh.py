@@ -0,0 +1,268 @@
+"""Tests for the aftr ssh command helpers."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from aftr.commands import ssh as ssh_module
+
+ED25519_PUB = (
+    "ssh-ed25519 AAAAC3NzaC1lZDI1NTE5AAAAIOMqqnkVzrm0SdG6UOoqKLsabgH5C9okWi0dh2l9GKJl"
+    " me@example.com"
+)
+
+
+@pytest.fixture
+def ssh_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """An isolated ~/.ssh directory with its own cache directory."""
+    ssh_dir = tmp_path / ".ssh"
+    ssh_dir.mkdir()
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(ssh_module, "SSH_DIR", ssh_dir)
+    monkeypatch.setattr(ssh_module.config, "get_cache_dir", lambda: cache_dir)
+    ssh_module.clear_key_cache()
+    yield ssh_dir
+    ssh_module.clear_key_cache()
+
+
+class TestDiscoverSshKeys:
+    def test_missing_ssh_dir(self, ssh_dir: Path) -> None:
+        ssh_dir.rmdir()
+        assert ssh_module.discover_ssh_keys() == []
+
+    def test_pairs_private_and_public_keys(self, ssh_dir: Path) -> None:
+        (ssh_dir / "id_ed25519").write_text("private", encoding="utf-8")
+        (ssh_dir / "id_ed25519.pub").write_text(ED25519_PUB, encoding="utf-8")
+        (ssh_dir / "known_hosts").write_text("", encoding="utf-8")
+
+        keys = ssh_module.discover_ssh_keys()
+
+        assert len(keys) == 1
+        key = keys[0]
+        assert key["name"] == "id_ed25519"
+        assert key["private_path"] == ssh_dir / "id_ed25519"
+        assert key["public_path"] == ssh_dir / "id_ed25519.pub"
+        assert key["has_public"] is True
+        assert key["key_type"] == "ed25519"
+        assert key["comment"] == "me@example.com"
+        # Same output as `ssh-keygen -l` for this key
+        assert (
+            key["fingerprint"] == "SHA256:+DiY3wvvV6TuJJhbpZisF/zLDA0zPMSvHdkr4UvCOqU"
+        )
+        assert key["bits"] == 256
+
+    def test_common_name_without_public_key(self, ssh_dir: Path) -> None:
+        (ssh_dir / "id_rsa").write_text("private", encoding="utf-8")
+        (ssh_dir / "random_file").write_text("data", encoding="utf-8")
+
+        keys = ssh_module.discover_ssh_keys()
+
+        assert [k["name"] for k in keys] == ["id_rsa"]
+        assert keys[0]["has_public"] is False
+        assert keys[0]["public_path"] is None
+
+    def test_maps_hosts_from_config(self, ssh_dir: Path) -> None:
+        (ssh_dir / "work.key").write_text("private", encoding="utf-8")
+        (ssh_dir / "work.key.pub").write_text(ED25519_PUB, encoding="utf-8")
+        (ssh_dir / "config").write_text(
+            'Host github.com gh\n  IdentityFile "~/.ssh/work.key"\n'
+            "Host other\n  IdentityFile ~/.ssh/missing\n",
+            encoding="utf-8",
+        )
+
+        keys = ssh_module.discover_ssh_keys()
+
+        assert keys[0]["hosts"] == ["github.com", "gh"]
+
+    def test_reuses_scan_until_cleared(self, ssh_dir: Path) -> None:
+        (ssh_dir / "id_rsa").write_text("private", encoding="utf-8")
+        first = ssh_module.discover_ssh_keys()
+        assert ssh_module.discover_ssh_keys() is first
+
+        (ssh_dir / "id_ed25519").write_text("private", encoding="utf-8")
+        ssh_module.clear_key_cache()
+        names = {k["name"] for k in ssh_module.discover_ssh_keys()}
+        assert names == {"id_rsa", "id_ed25519"}
+
+
+class TestGetDefaultKey:
+    def test_no_keys(self, ssh_dir: Path) -> None:
+        assert ssh_module.get_default_key() is None
+
+    def test_prefers_ed25519(self, ssh_dir: Path) -> None:
+        (ssh_dir / "id_rsa").write_text("private", encoding="utf-8")
+        (ssh_dir / "id_rsa.pub").write_text("ssh-rsa AAAA", encoding="utf-8")
+        (ssh_dir / "id_ed25519").write_text("private", encoding="utf-8")
+
+        assert ssh_module.get_default_key()["name"] == "id_ed25519"
+
+    def test_falls_back_to_key_with_public(self, ssh_dir: Path) -> None:
+        (ssh_dir / "id_dsa").write_text("private", encoding="utf-8")
+        (ssh_dir / "work").write_text("private", encoding="utf-8")
+        (ssh_dir / "work.pub").write_text(ED25519_PUB, encoding="utf-8")
+
+        default = ssh_module.get_default_key()
+
+        assert default["name"] == "work"
+        assert ssh_module.get_default_key() is default
+
+
+def _ssh_string(data: bytes) -> bytes:
+    return len(data).to_bytes(4, "big") + data
+
+
+class TestKeyBits:
+    def test_rsa_modulus_size(self) -> None:
+        modulus = b"\x00" + (1 << 2047).to_bytes(256, "big")
+        raw = (
+            _ssh_string(b"ssh-rsa")
+            + _ssh_string(b"\x01\x00\x01")
+            + _ssh_string(modulus)
+        )
+        assert ssh_module._key_bits(raw) == 2048
+
+    def test_unknown_algorithm(self) -> None:
+        assert ssh_module._key_bits(_ssh_string(b"ssh-unknown")) is None
+
+    def test_truncated_blob(self) -> None:
+        assert ssh_module._key_bits(_ssh_string(b"ssh-rsa") + b"\x00\x00\x01") is None
+
+
+class TestHostsIndexCache:
+    def test_writes_cache_on_first_parse(self, ssh_dir: Path, tmp_path: Path) -> None:
+        config_path = ssh_dir / "config"
+        config_path.write_text("Host a\n  IdentityFile ~/.ssh/id_a\n", encoding="utf-8")
+
+        hosts = ssh_module._load_cached_hosts_index(config_path)
+
+        assert hosts == {"id_a": ["a"]}
+        cached = json.loads((tmp_path / "cache" / "ssh_config.json").read_text())
+        assert cached["hosts"] == {"id_a": ["a"]}
+
+    def test_reuses_cache_when_config_unchanged(
+        self, ssh_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        config_path = ssh_dir / "config"
+        config_path.write_text("Host a\n  IdentityFile ~/.ssh/id_a\n", encoding="utf-8")
+        ssh_module._load_cached_hosts_index(config_path)
+
+        def fail(content: str) -> dict:
+            raise AssertionError("config should not be re-parsed")
+
+        monkeypatch.setattr(ssh_module, "_parse_ssh_config_hosts", fail)
+        assert ssh_module._load_cached_hosts_index(config_path) == {"id_a": ["a"]}
+
+    def test_reparses_when_config_changes(self, ssh_dir: Path) -> None:
+        config_path = ssh_dir / "config"
+        config_path.write_text("Host a\n  IdentityFile ~/.ssh/id_a\n", encoding="utf-8")
+        ssh_module._load_cached_hosts_index(config_path)
+
+        config_path.write_text(
+            "Host bb\n  IdentityFile ~/.ssh/id_bb\n", encoding="utf-8"
+        )
+
+        assert ssh_module._load_cached_hosts_index(config_path) == {"id_bb": ["bb"]}
+
+    def test_ignores_corrupt_cache(self, ssh_dir: Path, tmp_path: Path) -> None:
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        (cache_dir / "ssh_config.json").write_text("not json{{", encoding="utf-8")
+        config_path = ssh_dir / "config"
+        config_path.write_text("Host a\n  IdentityFile ~/.ssh/id_a\n", encoding="utf-8")
+
+        assert ssh_module._load_cached_hosts_index(config_path) == {"id_a": ["a"]}
+
+
+SC_QUERY_RUNNING = """
+SERVICE_NAME: ssh-agent
+        TYPE               : 10  WIN32_OWN_PROCESS
+        STATE              : 4  RUNNING
+                                (STOPPABLE, NOT_PAUSABLE, IGNORES_SHUTDOWN)
+        WIN32_EXIT_CODE    : 0  (0x0)
+"""
+
+SC_QC_AUTO = """
+[SC] QueryServiceConfig SUCCESS
+
+SERVICE_NAME: ssh-agent
+        TYPE               : 10  WIN32_OWN_PROCESS
+        START_TYPE         : 2   AUTO_START
+        ERROR_CONTROL      : 1   NORMAL
+"""
+
+
+def _completed(returncode: int, stdout: str) -> subprocess.CompletedProcess:
+    return subprocess.CompletedProcess(args=[], returncode=returncode, stdout=stdout)
+
+
+class TestQueryServiceSc:
+    def test_running_automatic(self) -> None:
+        with patch(
+            "aftr.commands.ssh.subprocess.run",
+            side_effect=[_completed(0, SC_QUERY_RUNNING), _completed(0, SC_QC_AUTO)],
+        ):
+            assert ssh_module._query_service_sc("ssh-agent") == (
+                "Running",
+                "Automatic",
+            )
+
+    def test_missing_service(self) -> None:
+        with patch(
+            "aftr.commands.ssh.subprocess.run",
+            return_value=_completed(ssh_module.SC_SERVICE_MISSING, ""),
+        ):
+            assert ssh_module._query_service_sc("ssh-agent") == ("", "")
+
+    def test_sc_not_available(self) -> None:
+        with patch("aftr.commands.ssh.subprocess.run", side_effect=FileNotFoundError):
+            assert ssh_module._query_service_sc("ssh-agent") is None
+
+
+class TestAgentStatus:
+    def test_stale_socket_reports_stopped(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        sock = tmp_path / "agent.sock"
+        sock.touch()
+        monkeypatch.setattr(ssh_module, "current_system", lambda: "Linux")
+        monkeypatch.setenv("SSH_AUTH_SOCK", str(sock))
+        monkeypatch.setenv("SSH_AGENT_PID", "12345")
+
+        with (
+            patch("aftr.commands.ssh.os.kill", side_effect=ProcessLookupError),
+            patch("aftr.commands.ssh.subprocess.run") as run,
+        ):
+            status = ssh_module.get_ssh_agent_status()
+
+        assert status["status"] == "stopped"
+        run.assert_not_called()
+
+    def test_agent_without_pid_is_assumed_alive(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.delenv("SSH_AGENT_PID", raising=False)
+        assert ssh_module._agent_process_alive() is True
+
+
+class TestGitConfig:
+    def test_reads_ssh_command_from_bulk_listing(self) -> None:
+        listing = "user.email\nme@example.com\0core.sshcommand\nssh -i key\0"
+        with patch(
+            "aftr.commands.ssh.subprocess.run", return_value=_completed(0, listing)
+        ) as run:
+            git_config = ssh_module.check_git_ssh_config()
+
+        assert git_config["ssh_command"] == "ssh -i key"
+        run.assert_called_once()
+
+    def test_missing_global_config(self) -> None:
+        with patch(
+            "aftr.commands.ssh.subprocess.run", return_value=_completed(128, "")
+        ):
+            assert ssh_module._read_git_global_config() == {}
@@ -0,0 +1,30 @@
+"""Tests for template loading."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+
+from aftr import template as template_module
+
+
+@pytest.fixture(autouse=True)
+def clear_template_cache() -> Iterator[None]:
+    """Start every test without a cached built-in template."""
+    template_module.load_default_template.cache_clear()
+    template_module.get_default_template_content.cache_clear()
+    yield
+
+
+class TestDefaultTemplateCache:
+    def test_default_template_is_parsed_once(self) -> None:
+        first = template_module.load_default_template()
+
+        assert template_module.load_template("default") is first
+        assert first.name == "Default"
+
+    def test_default_content_is_read_once(self) -> None:
+        content = template_module.get_default_template_content()
+
+        assert template_module.get_default_template_content() is content
@@ -0,0 +1,186 @@
+"""Tests for the PyPI update check."""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import httpx
+import pytest
+from typer.testing import CliRunner
+
+from aftr import update
+from aftr.cli import app
+
+
+def _pypi_client(handler) -> httpx.Client:
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture(autouse=True)
+def reset_client(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Start every test without a shared client."""
+    monkeypatch.setattr(update, "_client", None)
+    yield
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep the PyPI response cache out of the real user cache."""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(update.config, "get_cache_dir", lambda: cache_dir)
+    return cache_dir
+
+
+class TestGetLatestVersion:
+    def test_reads_version_from_pypi_json(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json={"info": {"version": "9.9.9"}})
+
+        monkeypatch.setattr(update, "_client", _pypi_client(handler))
+
+        assert update.get_latest_version() == "9.9.9"
+        assert str(requests[0].url) == update.PYPI_URL
+
+    def test_http_error_returns_none(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(
+            update, "_client", _pypi_client(lambda request: httpx.Response(503))
+        )
+        assert update.get_latest_version() is None
+
+
+class TestPypiCache:
+    def test_caches_response_with_etag(
+        self, cache_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(
+            update,
+            "_client",
+            _pypi_client(
+                lambda request: httpx.Response(
+                    200, json={"info": {"version": "2.0.0"}}, headers={"ETag": '"v2"'}
+                )
+            ),
+        )
+
+        assert update.get_latest_version() == "2.0.0"
+        cached = json.loads((cache_dir / update.PYPI_CACHE_FILE).read_text())
+        assert cached["version"] == "2.0.0"
+        assert cached["etag"] == '"v2"'
+
+    def test_fresh_cache_skips_request(
+        self, cache_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        cache_dir.mkdir()
+        (cache_dir / update.PYPI_CACHE_FILE).write_text(
+            json.dumps({"version": "2.0.0"})
+        )
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise AssertionError("PyPI should not be contacted")
+
+        monkeypatch.setattr(update, "_client", _pypi_client(handler))
+        assert update.get_latest_version() == "2.0.0"
+
+    def test_stale_cache_revalidates_with_etag(
+        self, cache_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        cache_dir.mkdir()
+        cache_file = cache_dir / update.PYPI_CACHE_FILE
+        cache_file.write_text(json.dumps({"version": "2.0.0", "etag": '"v2"'}))
+        stale = time.time() - update.PYPI_CACHE_TTL - 60
+        os.utime(cache_file, (stale, stale))
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(304)
+
+        monkeypatch.setattr(update, "_client", _pypi_client(handler))
+
+        assert update.get_latest_version() == "2.0.0"
+        assert requests[0].headers["If-None-Match"] == '"v2"'
+        assert cache_file.stat().st_mtime > stale
+
+
+class TestClient:
+    def test_client_is_shared(self) -> None:
+        client = update._get_client()
+        assert update._get_client() is client
+        assert client.headers["User-Agent"].startswith("aftr/")
+
+
+class TestBackgroundCheck:
+    def test_result_arrives_on_queue(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        info = {"status": "up_to_date", "current": "1.0.0", "latest": "1.0.0"}
+        monkeypatch.setattr(update, "check_for_update", lambda timeout: info)
+
+        results = update.start_background_update_check()
+
+        assert results.get(timeout=5) == info
+
+    def test_failure_puts_none(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        def boom(timeout: float) -> dict:
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(update, "check_for_update", boom)
+
+        assert update.start_background_update_check().get(timeout=5) is None
+
+    def test_take_result_does_not_wait(self) -> None:
+        assert update.take_update_result(queue.Queue()) is None
+
+    def test_take_result_waits_when_asked(self) -> None:
+        info = {"status": "up_to_date", "current": "1.0.0", "latest": "1.0.0"}
+        results: queue.Queue = queue.Queue()
+        threading.Timer(0.05, results.put, args=(info,)).start()
+
+        assert update.take_update_result(results, wait=5) == info
+
+    def test_banner_shown_in_menu_when_check_is_slow(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        info = {"status": "update_available", "current": "1.0.0", "latest": "9.0.0"}
+
+        def slow_check(timeout: float) -> dict:
+            time.sleep(0.1)
+            return info
+
+        shown: list[dict] = []
+        monkeypatch.setattr(update, "check_for_update", slow_check)
+        monkeypatch.setattr("aftr.cli.show_banner", lambda: None)
+        monkeypatch.setattr("aftr.cli.show_update_banner", shown.append)
+        monkeypatch.setattr(
+            "aftr.cli.inquirer.select",
+            lambda **kwargs: type("Prompt", (), {"execute": lambda self: "exit"})(),
+        )
+
+        result = CliRunner().invoke(app, [])
+
+        assert result.exit_code == 0
+        assert shown == [info]
+
+    def test_banner_shown_after_command(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        ready: queue.Queue = queue.Queue()
+        ready.put({"status": "update_available", "current": "1.0.0", "latest": "9.0.0"})
+        monkeypatch.setattr("aftr.cli.start_background_update_check", lambda: ready)
+
+        result = CliRunner().invoke(app, ["init", "proj", "--path", str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert "Update Available" in result.stdout
+        assert result.stdout.index("Update Available") > result.stdout.index(
+            "pyproject.toml"
+        )